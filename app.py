@@ -1,4 +1,5 @@
 import streamlit as st
+from utils.images import picture_html
 
 # ------------------- Set Page Configuration -------------------
 st.set_page_config(page_title="Welcome", layout="wide")
@@ -46,9 +47,9 @@ header {visibility: hidden;}
 st.markdown(custom_css, unsafe_allow_html=True)
 
 # ------------------- Banner -------------------
-# Display the banner image without any overlaid text
-st.image("https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/pp_banner_linkedin.jfif", 
-         use_container_width=True)
+# Display the banner image without any overlaid text; served from static/img (see utils/images.py)
+st.markdown(picture_html("pp_banner_linkedin.jfif", alt="Banner", sizes="100vw", css_class="banner-img"),
+            unsafe_allow_html=True)
 
 # ------------------- Main Content -------------------
 st.markdown("<div class='main'>", unsafe_allow_html=True)
@@ -1,6 +1,7 @@
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh  # Ensure this package is installed: pip install streamlit_autorefresh
+import streamlit.components.v1 as components
 import time
+from utils.images import CAROUSEL_PHOTOS, CAROUSEL_WIDTH, carousel_html
 
 # ---- Remove default Streamlit menu and footer ----
 hide_streamlit_style = """
@@ -45,31 +46,10 @@ def show_about_me():
 
     # Right column: Animated, centered images
     with col_image:
-        # List of image URLs
-        image_urls = [
-            'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/Wedding_Reception.jpg',
-            'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/SuShi_Plus_Rishi.jpg',
-            'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/SuShi_Wedding.jpg',
-            'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/San_Diego_Bikes.jpg',
-            'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/Rob_Rishi_Housewarming.jpg'
-        ]
-
-        # Use a container with custom HTML/CSS to center the image vertically and horizontally
-        st.markdown("<div style='display: flex; justify-content: center; align-items: center; height: 100%;'>", unsafe_allow_html=True)
-        
-        # Auto-refresh every 3000 ms (3 seconds) to cycle images
-        st_autorefresh(interval=3000, limit=1000, key="image_autorefresh")
-        
-        # Initialize or update image index in session state
-        if 'image_index' not in st.session_state:
-            st.session_state['image_index'] = 0
-        else:
-            # Increment the index automatically; using modulus ensures it cycles
-            st.session_state['image_index'] = (st.session_state['image_index'] + 1) % len(image_urls)
-        
-        # Display the current image (centered)
-        st.image(image_urls[st.session_state['image_index']], width=300)
-        st.markdown("</div>", unsafe_allow_html=True)
+        # Resized WebP/AVIF derivatives of the photos in files/, served from static/img (see utils/images.py).
+        # All photos load once and rotate every 3 seconds in the browser, without rerunning this script.
+        carousel, height = carousel_html(CAROUSEL_PHOTOS, width=CAROUSEL_WIDTH, interval_ms=3000)
+        components.html(carousel, height=height)
 
 # Call the function to show the About Me page
 show_about_me()
@@ -1,7 +1,11 @@
 # Importing necessary packages
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from utils import chart_reduction
+from utils.datasets import load_dataset, snapshot_hash
+from utils.heavy_hitters import HeavyHitters
+from utils.ingest import STREAMING_THRESHOLD_BYTES, excel_sheet_names, file_hash, ingest_csv, ingest_excel, observe_frame
+from utils.summary_stats import SummaryStats
 
 # Setting up web app page
 st.set_page_config(page_title='Exploratory Data Analysis', page_icon=None, layout="wide")
@@ -63,18 +67,61 @@ ft = st.sidebar.selectbox("*What is the file type?*", ["csv", "Excel"])
 # Creating dynamic file upload option in sidebar
 uploaded_file = st.sidebar.file_uploader("*Upload file here*", type=['csv', 'xlsx'])
 
-# Path to the default CSV file in your GitHub repository
-default_file_path = 'https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/ev_charging_patterns.csv'
+@st.cache_data
+def load_default_data(name, snapshot):
+    # snapshot is only part of the cache key so a changed CSV is picked up
+    return load_dataset(name)
 
-# Default to loading the CSV from GitHub if no file is uploaded
+def profile_observers():
+    # Summary statistics and heavy hitters per column, collected in one pass over the data
+    return [SummaryStats(), HeavyHitters()]
+
+@st.cache_data(show_spinner="Ingesting upload in chunks...")
+def ingest_upload(file_id, _uploaded_file, file_type, sheet_name=None, header=0):
+    # file_id identifies the upload for the cache; the file object itself is not hashed
+    if file_type == 'Excel':
+        return ingest_excel(_uploaded_file, sheet_name, header, observers_factory=profile_observers)
+    return ingest_csv(_uploaded_file, observers_factory=profile_observers)
+
+@st.cache_data(show_spinner="Profiling data...")
+def profile_data(data_key, _data):
+    # data_key (dataset snapshot or upload hash) identifies the data for the cache
+    return observe_frame(_data, profile_observers())
+
+# Streaming ingest result for large uploads (None when the file was read fully into memory)
+ingested = None
+
+# Default to loading the bundled EV charging dataset if no file is uploaded
 if uploaded_file is None and ft == 'csv':
-    st.info(f"Loading default CSV file from GitHub: {default_file_path}")
-    file_path = default_file_path
-    data = pd.read_csv(file_path)
+    st.info("Loading default CSV file: files/ev_charging_patterns.csv")
+    data_key = snapshot_hash("ev_charging")
+    data = load_default_data("ev_charging", data_key)
 elif uploaded_file is not None:
     file_path = uploaded_file
 
-    if ft == 'Excel':
+    # Large uploads are streamed to a columnar file in chunks; only a sampled preview is kept in memory
+    streaming = st.sidebar.checkbox("*Streaming ingest (large files)*",
+                                    value=uploaded_file.size > STREAMING_THRESHOLD_BYTES,
+                                    help="Reads the file in chunks, spills it to disk and keeps a random sample in memory.")
+
+    if streaming:
+        try:
+            if ft == 'Excel':
+                sheet_names = excel_sheet_names(file_path)
+                st.write("Sheet names found in Excel:", sheet_names)
+                sh = st.sidebar.selectbox("*Which sheet name in the file should be read?*", sheet_names)
+                h = st.sidebar.number_input("*Which row contains the column names?*", 0, 100)
+                ingested = ingest_upload(uploaded_file.file_id, file_path, ft, sh, int(h))
+            else:
+                ingested = ingest_upload(uploaded_file.file_id, file_path, ft)
+            data = ingested.preview
+            st.info(f"Streaming ingest: {ingested.n_rows:,} rows were written to disk. "
+                    f"The preview and views below use a random sample of {len(data):,} rows.")
+        except Exception as e:
+            st.error(f"Error reading file: {e}")
+            st.stop()
+
+    elif ft == 'Excel':
         try:
             # Check sheet names in the Excel file and display them
             excel_file = pd.ExcelFile(file_path)
@@ -88,6 +135,7 @@ elif uploaded_file is not None:
             
             # Reading the Excel file with the selected sheet and header row
             data = pd.read_excel(file_path, header=int(h), sheet_name=sh, engine='openpyxl')
+            data_key = (file_hash(file_path), sh, int(h))
 
         except Exception as e:
             st.error(f"Error reading Excel file: {e}")
@@ -97,6 +145,7 @@ elif uploaded_file is not None:
         try:
             # Reading the CSV file
             data = pd.read_csv(file_path)
+            data_key = file_hash(file_path)
         except Exception as e:
             st.error(f"Error reading CSV file: {e}")
             st.stop()
@@ -119,6 +168,8 @@ else:
 st.write('### 2. Data Exploration')
 
 if 'data' in locals() and data is not None:
+    summary, hitters = ingested.observers if ingested is not None else profile_data(data_key, data)
+
     # Creating radio button for different insights about the data, with "Summary Statistics" as the default
     selected = st.sidebar.radio("**B) What would you like to know about the data?**", 
                                 ["Summary Statistics", 
@@ -129,12 +180,19 @@ if 'data' in locals() and data is not None:
 
     # Showing summary statistics (Summary Statistics)
     if selected == 'Summary Statistics':
-        ss = pd.DataFrame(data.describe(include='all').round(2).fillna(''))
+        # Single-pass sketches: exact on small data, approximate quantiles and distinct counts on large data
+        ss = pd.DataFrame(summary.result(hitters).round(2).fillna(''))
+        approximate = summary.approximate_unique()
+        for column in approximate:
+            ss.loc['unique', column] = f"≈{ss.loc['unique', column]:,.0f}"
         st.dataframe(ss, use_container_width=True)
+        if approximate:
+            st.caption(f"≈ marks estimated distinct counts ({', '.join(map(str, approximate))}). "
+                       "Top/freq are left blank where the most frequent value's count could not be confirmed exactly.")
 
     # Showing the shape of the dataframe (Data Dimensions)
     elif selected == 'Data Dimensions':
-        st.write('###### The data has the dimensions:', data.shape)
+        st.write('###### The data has the dimensions:', data.shape if ingested is None else (ingested.n_rows, len(ingested.columns)))
 
     # Showing field types (Field Descriptions)
     elif selected == 'Field Descriptions':
@@ -145,7 +203,12 @@ if 'data' in locals() and data is not None:
     elif selected == 'Value Counts of Fields':
         # Creating a radio button to select which object field to investigate
         sub_selected = st.sidebar.radio("*Which field should be investigated?*", data.select_dtypes('object').columns)
-        vc = data[sub_selected].value_counts().reset_index().rename(columns={'index': sub_selected, sub_selected: 'Count'}).reset_index(drop=True)
+        # Counts come from the heavy-hitter sketch: exact for up to 10,000 distinct values, otherwise the top values with an error bound
+        vc = hitters.top(sub_selected).rename(columns={'value': sub_selected, 'count': 'Count', 'max_error': 'Max Overcount'})
+        if hitters.exact(sub_selected):
+            vc = vc.drop(columns='Max Overcount')
+        else:
+            st.caption(f"High-cardinality field: showing the {len(vc):,} most frequent values. Counts are upper bounds, at most 'Max Overcount' above the true count.")
         st.dataframe(vc, use_container_width=True)
 
 # ================================================================================================
@@ -171,21 +234,23 @@ if 'data' in locals() and data is not None:
 
     # Filter data for Top X values if the option is selected
     if filter_top_x and top_x:
-        top_data = data.groupby(x_axis)[y_axis].count().nlargest(top_x).reset_index()
+        # Row counts per X value from the heavy-hitter sketch built during profiling
+        top_data = hitters.top(x_axis, top_x).rename(columns={'value': x_axis, 'count': y_axis})[[x_axis, y_axis]]
         st.write(f"Displaying Top {top_x} values based on the count of {y_axis}.")
     else:
         top_data = data
 
-    # Generate visualizations based on user selections
+    # Generate visualizations based on user selections; large inputs are reduced before plotting
     if chart_type == "Bar":
-        fig = px.bar(top_data, x=x_axis, y=y_axis)
+        fig, reduction = chart_reduction.bar(top_data, x=x_axis, y=y_axis)
     elif chart_type == "Line":
-        fig = px.line(top_data, x=x_axis, y=y_axis)
+        fig, reduction = chart_reduction.line(top_data, x=x_axis, y=y_axis)
     elif chart_type == "Scatter":
-        fig = px.scatter(top_data, x=x_axis, y=y_axis)
+        fig, reduction = chart_reduction.scatter(top_data, x=x_axis, y=y_axis)
 
     # Display the chart
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(reduction)
 
 else:
     st.error("No data available for visualization. Please upload a file and try again.")
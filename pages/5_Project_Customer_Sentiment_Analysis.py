@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from wordcloud import WordCloud
+from utils.aspect_index import AspectIndex, counts_key
+from utils.datasets import load_dataset, snapshot_hash
+from utils.prefix_index import PrefixIndex
+from utils.review_store import ReviewStore
 
 # ---- Set Page Configuration ----
 st.set_page_config(
@@ -85,9 +89,37 @@ with st.expander("Step 4: Visualization & Insights"):
 
 # ---- Dataset Preview Section ----
 st.header("Dataset Preview")
-data_url = "https://github.com/puravpatel3/portfolio/raw/9120460482515ef843eee964f7278e5b81b889ee/files/final_amazon_sentiment_dataset.csv"
-df = pd.read_csv(data_url)
-df["review_date"] = pd.to_datetime(df["review_date"])
+
+@st.cache_data
+def load_data(name, snapshot):
+    # snapshot is only part of the cache key so a changed CSV is picked up
+    return load_dataset(name)
+
+@st.cache_resource
+def get_aspect_index(snapshot):
+    # Aspects tokenized once per dataset snapshot, shared by all sessions
+    return AspectIndex(load_data("amazon_sentiment", snapshot)["refined_aspects"])
+
+@st.cache_resource
+def get_review_store(snapshot):
+    # Reviews sorted by date with per-quarter sentiment x product counts, shared by all sessions
+    return ReviewStore(load_data("amazon_sentiment", snapshot))
+
+@st.cache_resource
+def get_product_index(snapshot):
+    # Product IDs sorted for prefix search, ranked by their number of reviews
+    review_store = get_review_store(snapshot)
+    return PrefixIndex(review_store.products, review_store.product_totals)
+
+@st.cache_data(max_entries=256)
+def render_wordcloud(snapshot, counts_hash, _frequencies):
+    # Keyed by the hash of the aspect counts, so any filter selection with the same counts reuses the image
+    wordcloud = WordCloud(width=800, height=400, background_color="white", colormap="Blues")
+    return wordcloud.generate_from_frequencies(_frequencies).to_array()
+
+snapshot = snapshot_hash("amazon_sentiment")
+df = load_data("amazon_sentiment", snapshot)
+review_store = get_review_store(snapshot)
 st.dataframe(df.head(), height=250)
 
 st.markdown("""
@@ -104,29 +136,36 @@ st.markdown("""
 st.sidebar.header("Filter Data")
 
 # Date Filter
-min_date = df["review_date"].min()
-max_date = df["review_date"].max()
+min_date = pd.Timestamp(review_store.dates[0])
+max_date = pd.Timestamp(review_store.dates[-1])
 date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date], min_value=min_date, max_value=max_date)
 
-# Product ID Filter
-product_options = df["ProductId"].unique()
-selected_product = st.sidebar.selectbox("Select Product ID", ["All"] + list(product_options))
+# Product ID Filter: typing narrows the options to the most reviewed matching IDs, so only a bounded list is sent
+product_index = get_product_index(snapshot)
+product_query = st.sidebar.text_input("Search Product ID", key="product_query", placeholder="Type the start of an ID")
+product_matches = product_index.search(product_query)
+product_options = list(product_matches)
+current_product = st.session_state.get("selected_product", "All")
+if current_product != "All" and current_product not in product_options:
+    # Keep the current selection available while the search shows other IDs
+    product_options = [current_product] + product_options
+selected_product = st.sidebar.selectbox("Select Product ID", ["All"] + product_options, key="selected_product")
+st.sidebar.caption(f"Showing {len(product_matches):,} of {product_index.count(product_query):,} matching products, "
+                   "most reviewed first.")
 
 # Sentiment Filter
 sentiment_options = ["All", "Positive", "Neutral", "Negative"]
 selected_sentiment = st.sidebar.selectbox("Select Sentiment", sentiment_options)
 
 # ---- Apply Filters ----
-filtered_df = df[
-    (df["review_date"] >= pd.to_datetime(date_range[0])) &
-    (df["review_date"] <= pd.to_datetime(date_range[1]))
-]
-
-if selected_product != "All":
-    filtered_df = filtered_df[filtered_df["ProductId"] == selected_product]
-
-if selected_sentiment != "All":
-    filtered_df = filtered_df[filtered_df["overall_sentiment"] == selected_sentiment]
+# Binary searches over the date-sorted store plus the precomputed quarterly counts, not a scan of every review
+filters = dict(
+    start=pd.to_datetime(date_range[0]),
+    end=pd.to_datetime(date_range[1]),
+    product=None if selected_product == "All" else selected_product,
+    sentiment=None if selected_sentiment == "All" else selected_sentiment
+)
+review_counts = review_store.counts(**filters)
 
 # ---- 6️⃣ Data Visualizations ----
 st.header("Data Visualizations")
@@ -139,7 +178,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Sentiment Distribution")
-    sentiment_counts = filtered_df["overall_sentiment"].value_counts().reset_index()
+    sentiment_counts = review_store.sentiment_counts(review_counts).reset_index()
     sentiment_counts.columns = ["Sentiment", "Count"]
     fig = px.bar(sentiment_counts, x="Sentiment", y="Count", 
                  color="Sentiment", 
@@ -151,8 +190,8 @@ with col1:
 
 with col2:
     st.subheader("Sentiment Over Time (Quarterly)")
-    filtered_df["quarter"] = filtered_df["review_date"].dt.to_period("Q").astype(str)
-    sentiment_trend = filtered_df.groupby(["quarter", "overall_sentiment"]).size().reset_index(name="Count")
+    sentiment_trend = review_store.quarterly_trend(review_counts)
+    sentiment_trend.columns = ["quarter", "overall_sentiment", "Count"]
     fig2 = px.line(sentiment_trend, x="quarter", y="Count", color="overall_sentiment",
                    markers=True, color_discrete_map=sentiment_palette,
                    hover_data={"Count": ":,d"},
@@ -166,7 +205,7 @@ col3, col4 = st.columns(2)
 with col3:
     st.subheader("Top 10 Reviewed Products")
     # Get the top 10 reviewed products, sorted descending by review count
-    product_counts = filtered_df["ProductId"].value_counts().head(10).reset_index()
+    product_counts = review_store.top_products(review_counts, 10).reset_index()
     product_counts.columns = ["ProductId", "Review Count"]
     product_counts = product_counts.sort_values("Review Count", ascending=False)
     fig3 = px.bar(product_counts, x="Review Count", y="ProductId", orientation='h',
@@ -179,9 +218,13 @@ with col3:
 
 with col4:
     st.subheader("Frequent Aspects in Reviews")
-    aspect_text = " ".join(filtered_df["refined_aspects"].dropna().astype(str))
-    wordcloud = WordCloud(width=800, height=400, background_color="white", colormap="Blues").generate(aspect_text)
-    st.image(wordcloud.to_array(), use_container_width=True)
+    aspect_index = get_aspect_index(snapshot)
+    term_counts = aspect_index.term_counts(review_store.positions(**filters))
+    if term_counts.any():
+        image = render_wordcloud(snapshot, counts_key(term_counts), aspect_index.frequencies(term_counts))
+        st.image(image, use_container_width=True)
+    else:
+        st.info("No aspects mentioned in the selected reviews.")
 
 # ---- Key Takeaways ----
 st.header("Key Takeaways")
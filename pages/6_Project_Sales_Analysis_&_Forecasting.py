@@ -1,10 +1,18 @@
+import uuid
+from functools import partial
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from prophet import Prophet
-from prophet.plot import plot_plotly  # Importing the Plotly plotting function for Prophet
 import plotly.io as pio
 import matplotlib.dates as mdates
+from utils.car_cube import CATEGORICAL_DIMENSIONS, load_cube, quarterly_rollup, rollup
+from utils.datasets import load_dataset, snapshot_hash
+from utils.facets import Facets
+from utils.figure_cache import FIGURE_CACHE_DIR, FigureCache, figure_key
+from utils.filter_index import FilterIndex
+from utils.forecast_cache import ForecastCache, cache_key, frame_fingerprint
+from utils.forecast_executor import ForecastExecutor
+from utils.forecast_rollups import forecast_table, period_rollup
+from utils.forecasting import BACKEND_LABELS, PROPHET_PARAMS, fit_prophet, fit_with_backend, plot_forecast
 
 # ------------------- Page Configuration -------------------
 st.set_page_config(page_title="Sales Analysis and Forecasting for Automotive Industry", layout="wide")
@@ -108,30 +116,64 @@ st.markdown("""
 *Click on the 'Download raw file' button in GitHub to access the data.*
 """)
 st.subheader("Dataset Preview")
-csv_url = 'https://raw.githubusercontent.com/puravpatel3/portfolio/7e1c707c1363b45cc59b4ed89a411f88fae04e82/files/car_sales.csv'
-df = pd.read_csv(csv_url)
-df['Date'] = pd.to_datetime(df['Date'])
+
+@st.cache_data
+def load_data(name, snapshot):
+    # snapshot is only part of the cache key so a changed CSV is picked up
+    return load_dataset(name)
+
+@st.cache_data
+def load_sales_cube(snapshot):
+    # Daily sales per (Date, Region, Dealer, Model, Body Style); charts roll this up instead of rescanning rows
+    return load_cube()
+
+@st.cache_resource
+def get_cube_index(snapshot):
+    # Bitmaps over the cube's region/dealer/model/body style columns, shared by all sessions
+    return FilterIndex(load_sales_cube(snapshot), CATEGORICAL_DIMENSIONS)
+
+df = load_data("car_sales", snapshot_hash("car_sales"))
+cube = load_sales_cube(snapshot_hash("car_sales"))
+cube_index = get_cube_index(snapshot_hash("car_sales"))
+
+@st.cache_resource
+def get_cube_facets(snapshot):
+    # Option lists counted in cars sold (the cube's units), not cube cells
+    return Facets(get_cube_index(snapshot), load_sales_cube(snapshot)['units'])
+
+cube_facets = get_cube_facets(snapshot_hash("car_sales"))
 st.dataframe(df.head(), height=250)
 
 # ------------------- Sidebar Filters -------------------
 st.sidebar.header("Filter Options")
-region_filter = st.sidebar.selectbox('Select Dealer Region', options=['All'] + sorted(df['Dealer_Region'].unique()))
-if region_filter == 'All':
-    dealer_filter = st.sidebar.selectbox('Select Dealer', options=['All'] + sorted(df['Dealer_Name'].unique()))
-else:
-    filtered_dealers = df[df['Dealer_Region'] == region_filter]['Dealer_Name'].unique()
-    dealer_filter = st.sidebar.selectbox('Select Dealer', options=['All'] + sorted(filtered_dealers))
-car_model_filter = st.sidebar.selectbox('Select Car Model', options=['All'] + sorted(df['Model'].unique()))
-body_style_filter = st.sidebar.selectbox('Select Body Style', options=['All'] + sorted(df['Body Style'].unique()))
-filtered_df = df.copy()
-if region_filter != 'All':
-    filtered_df = filtered_df[filtered_df['Dealer_Region'] == region_filter]
-if dealer_filter != 'All':
-    filtered_df = filtered_df[filtered_df['Dealer_Name'] == dealer_filter]
-if body_style_filter != 'All':
-    filtered_df = filtered_df[filtered_df['Body Style'] == body_style_filter]
-if car_model_filter != 'All':
-    filtered_df = filtered_df[filtered_df['Model'] == car_model_filter]
+
+def facet_selectbox(label, column, selections):
+    # Cascading filter: only values that still match the filters above are offered, with their sales counts.
+    # The fixed key keeps the current choice when the counts change, as long as it is still available.
+    counts = dict(cube_facets.options(column, selections))
+    return st.sidebar.selectbox(label, options=['All'] + list(counts), key=f'filter_{column}',
+                                format_func=lambda v: v if v == 'All' else f"{v} ({counts[v]:,})")
+
+region_filter = facet_selectbox('Select Dealer Region', 'Dealer_Region', {})
+dealer_filter = facet_selectbox('Select Dealer', 'Dealer_Name', {'Dealer_Region': region_filter})
+car_model_filter = facet_selectbox('Select Car Model', 'Model',
+                                   {'Dealer_Region': region_filter, 'Dealer_Name': dealer_filter})
+body_style_filter = facet_selectbox('Select Body Style', 'Body Style',
+                                    {'Dealer_Region': region_filter, 'Dealer_Name': dealer_filter,
+                                     'Model': car_model_filter})
+filters = {'Dealer_Region': region_filter, 'Dealer_Name': dealer_filter,
+           'Model': car_model_filter, 'Body Style': body_style_filter}
+filtered_cube = cube[cube_index.mask(filters)]
+
+@st.cache_resource
+def get_figure_cache():
+    # Built figures shared by all sessions; most visitors keep the default "All" filters
+    return FigureCache(spill_directory=FIGURE_CACHE_DIR)
+
+def cached_figure(chart, build, **inputs):
+    # Figures are keyed by chart, filters (plus any extra inputs) and data snapshot; build only runs on a miss
+    key = figure_key('car_sales', chart, dict(filters, **inputs), snapshot_hash("car_sales"))
+    return get_figure_cache().get_or_build(key, build)
 
 # ------------------- Sales Analysis Visualizations -------------------
 st.header("Sales Analysis Visualizations")
@@ -144,58 +186,65 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Sales Distribution by Region (Stacked by Body Style)")
-    # Group by both Dealer Region and Body Style
-    sales_by_region_body = filtered_df.groupby(['Dealer_Region', 'Body Style']).agg(total_sales=('Price ($)', 'sum')).reset_index()
-    fig1 = px.bar(sales_by_region_body, 
-              x='Dealer_Region', 
-              y='total_sales', 
-              color='Body Style',
-              hover_data={'total_sales':':$,.2f'},
-              labels={'Dealer_Region':'Region', 'total_sales':'Total Sales ($)'},
-              title="Sales by Region (Stacked by Body Style)")
-    fig1.update_layout(barmode='stack', xaxis_title="Region", yaxis_title="Total Sales ($)", hovermode="x unified")
-    st.plotly_chart(fig1, use_container_width=True)
+    def build_fig1():
+        # Group by both Dealer Region and Body Style
+        sales_by_region_body = rollup(filtered_cube, ['Dealer_Region', 'Body Style']).rename(columns={'sales': 'total_sales'})
+        fig1 = px.bar(sales_by_region_body, 
+                  x='Dealer_Region', 
+                  y='total_sales', 
+                  color='Body Style',
+                  hover_data={'total_sales':':$,.2f'},
+                  labels={'Dealer_Region':'Region', 'total_sales':'Total Sales ($)'},
+                  title="Sales by Region (Stacked by Body Style)")
+        fig1.update_layout(barmode='stack', xaxis_title="Region", yaxis_title="Total Sales ($)", hovermode="x unified")
+        return fig1
+    st.plotly_chart(cached_figure('fig1', build_fig1), use_container_width=True)
 
 with col2:
     st.subheader("Car Sales Over Time (by Quarter)")
-    filtered_df['YearQuarter'] = filtered_df['Date'].dt.year.astype(str) + "Q" + (((filtered_df['Date'].dt.month - 1) // 3 + 1).astype(str))
-    sales_by_quarter = filtered_df.groupby('YearQuarter').agg(total_sales=('Price ($)', 'sum')).reset_index()
-    fig2 = px.bar(sales_by_quarter, x='YearQuarter', y='total_sales',
-                  hover_data={'total_sales':':$,.2f'},
-                  labels={'YearQuarter':'Year-Quarter', 'total_sales':'Total Sales ($)'},
-                  title="Car Sales Over Time (by YearQuarter)")
-    fig2.update_traces(marker_color="#99ccff")
-    fig2.update_layout(xaxis_title="YearQuarter", yaxis_title="Total Sales ($)", hovermode="x unified")
-    st.plotly_chart(fig2, use_container_width=True)
+    def build_fig2():
+        sales_by_quarter = quarterly_rollup(filtered_cube).rename(columns={'sales': 'total_sales'})
+        fig2 = px.bar(sales_by_quarter, x='YearQuarter', y='total_sales',
+                      hover_data={'total_sales':':$,.2f'},
+                      labels={'YearQuarter':'Year-Quarter', 'total_sales':'Total Sales ($)'},
+                      title="Car Sales Over Time (by YearQuarter)")
+        fig2.update_traces(marker_color="#99ccff")
+        fig2.update_layout(xaxis_title="YearQuarter", yaxis_title="Total Sales ($)", hovermode="x unified")
+        return fig2
+    st.plotly_chart(cached_figure('fig2', build_fig2), use_container_width=True)
 
 # Group 2: Top 5 Dealers by Revenue & Top 5 Car Models by Sales side by side
 col3, col4 = st.columns(2)
 
 with col3:
     st.subheader("Top 5 Dealers by Revenue (Stacked by Body Style)")
-    revenue_by_dealer_body = filtered_df.groupby(['Dealer_Name', 'Body Style']).agg(total_revenue=('Price ($)', 'sum')).reset_index()
-    total_revenue_by_dealer = filtered_df.groupby('Dealer_Name').agg(total_revenue=('Price ($)', 'sum')).reset_index()
-    top_5_dealers = total_revenue_by_dealer.nlargest(5, 'total_revenue')['Dealer_Name']
-    revenue_by_dealer_body = revenue_by_dealer_body[revenue_by_dealer_body['Dealer_Name'].isin(top_5_dealers)]
-    fig3 = px.bar(revenue_by_dealer_body, x='Dealer_Name', y='total_revenue',
-                  color='Body Style',
-                  labels={'Dealer_Name':'Dealer Name', 'total_revenue':'Total Revenue ($)'},
-                  title="Top 5 Dealers by Revenue (Stacked by Body Style)",
-                  hover_data={'total_revenue':':$,.2f'},
-                  barmode='stack')
-    fig3.update_layout(xaxis_title="Dealer Name", yaxis_title="Total Revenue ($)", hovermode="x unified")
-    st.plotly_chart(fig3, use_container_width=True)
+    def build_fig3():
+        revenue_by_dealer_body = rollup(filtered_cube, ['Dealer_Name', 'Body Style']).rename(columns={'sales': 'total_revenue'})
+        total_revenue_by_dealer = revenue_by_dealer_body.groupby('Dealer_Name', observed=True).agg(total_revenue=('total_revenue', 'sum')).reset_index()
+        top_5_dealers = total_revenue_by_dealer.nlargest(5, 'total_revenue')['Dealer_Name']
+        revenue_by_dealer_body = revenue_by_dealer_body[revenue_by_dealer_body['Dealer_Name'].isin(top_5_dealers)]
+        fig3 = px.bar(revenue_by_dealer_body, x='Dealer_Name', y='total_revenue',
+                      color='Body Style',
+                      labels={'Dealer_Name':'Dealer Name', 'total_revenue':'Total Revenue ($)'},
+                      title="Top 5 Dealers by Revenue (Stacked by Body Style)",
+                      hover_data={'total_revenue':':$,.2f'},
+                      barmode='stack')
+        fig3.update_layout(xaxis_title="Dealer Name", yaxis_title="Total Revenue ($)", hovermode="x unified")
+        return fig3
+    st.plotly_chart(cached_figure('fig3', build_fig3), use_container_width=True)
 
 with col4:
     st.subheader("Top 5 Car Models by Sales")
-    sales_by_model = filtered_df.groupby('Model').agg(total_sales=('Price ($)', 'sum')).reset_index().nlargest(5, 'total_sales')
-    fig4 = px.bar(sales_by_model, x='Model', y='total_sales',
-                  hover_data={'total_sales':':$,.2f'},
-                  labels={'Model':'Car Model', 'total_sales':'Total Sales ($)'},
-                  title="Top 5 Car Models by Sales")
-    fig4.update_traces(marker_color="#99ccff")
-    fig4.update_layout(xaxis_title="Car Model", yaxis_title="Total Sales ($)", hovermode="x unified")
-    st.plotly_chart(fig4, use_container_width=True)
+    def build_fig4():
+        sales_by_model = rollup(filtered_cube, 'Model').rename(columns={'sales': 'total_sales'}).nlargest(5, 'total_sales')
+        fig4 = px.bar(sales_by_model, x='Model', y='total_sales',
+                      hover_data={'total_sales':':$,.2f'},
+                      labels={'Model':'Car Model', 'total_sales':'Total Sales ($)'},
+                      title="Top 5 Car Models by Sales")
+        fig4.update_traces(marker_color="#99ccff")
+        fig4.update_layout(xaxis_title="Car Model", yaxis_title="Total Sales ($)", hovermode="x unified")
+        return fig4
+    st.plotly_chart(cached_figure('fig4', build_fig4), use_container_width=True)
 
 # ------------------- Advanced Analytics Section -------------------
 st.header("Advanced Analytics")
@@ -203,68 +252,107 @@ st.subheader("Sales Breakdown by Region and Car Model")
 st.write("""
 This heatmap visualizes the sales performance of various car models across different dealer regions. The color gradient represents total sales volume in millions of dollars.
 """)
-sales_by_region_model = filtered_df.groupby(['Dealer_Region', 'Model']).agg(total_sales=('Price ($)', 'sum')).reset_index()
-top_models = sales_by_region_model.groupby('Model').agg(total_sales=('total_sales', 'sum')).nlargest(10, 'total_sales').index
-filtered_sales = sales_by_region_model[sales_by_region_model['Model'].isin(top_models)]
-heatmap_data = filtered_sales.pivot_table(index='Dealer_Region', columns='Model', values='total_sales', aggfunc='sum')
-heatmap_data_m = heatmap_data / 1_000_000  # Convert to millions for display
-fig5 = px.imshow(heatmap_data_m,
-                 text_auto=".1f",
-                 aspect="auto",
-                 color_continuous_scale="RdYlGn",
-                 labels={"color": "Total Sales ($M)"},
-                 title="Sales Breakdown by Region and Car Model")
-st.plotly_chart(fig5, use_container_width=True)
+def build_fig5():
+    sales_by_region_model = rollup(filtered_cube, ['Dealer_Region', 'Model']).rename(columns={'sales': 'total_sales'})
+    top_models = sales_by_region_model.groupby('Model', observed=True).agg(total_sales=('total_sales', 'sum')).nlargest(10, 'total_sales').index
+    filtered_sales = sales_by_region_model[sales_by_region_model['Model'].isin(top_models)]
+    heatmap_data = filtered_sales.pivot_table(index='Dealer_Region', columns='Model', values='total_sales', aggfunc='sum', observed=True)
+    heatmap_data_m = heatmap_data / 1_000_000  # Convert to millions for display
+    return px.imshow(heatmap_data_m,
+                     text_auto=".1f",
+                     aspect="auto",
+                     color_continuous_scale="RdYlGn",
+                     labels={"color": "Total Sales ($M)"},
+                     title="Sales Breakdown by Region and Car Model")
+# Below-the-fold sections only run while expanded; their figures and forecasts stay cached afterwards
+heatmap_section = st.expander("Show sales breakdown heatmap", key="section_advanced_analytics", on_change="rerun")
+if heatmap_section.open:
+    heatmap_section.plotly_chart(cached_figure('fig5', build_fig5), use_container_width=True)
 
 # ------------------- Forecasting Section -------------------
+@st.cache_resource
+def get_forecast_executor():
+    # One bounded pool per server process, shared by all sessions
+    return ForecastExecutor(ForecastCache())
+
+def show_pending_forecast(history, chart, status):
+    # Shows the actuals while the fit runs; each status update also lets Streamlit interrupt on a rerun
+    drawn = []
+    def on_wait(elapsed):
+        if not drawn:
+            chart.plotly_chart(px.line(history, x='ds', y='y', title="Historical Revenue (forecast loading...)",
+                                       labels={'ds': 'Date', 'y': 'Revenue ($)'}), use_container_width=True)
+            drawn.append(True)
+        status.caption(f"Fitting forecast... {elapsed:.0f}s")
+    return on_wait
+
 st.header("Revenue Forecasting")
 st.subheader("Revenue Forecasting for Regions")
 st.write("""
 This time series forecast predicts revenue trends for all regions over the next year based on historical data. By analyzing past sales performance and projecting future revenue, 
 this forecast enables proactive decisions on inventory, staffing, and advertising. The forecast includes confidence intervals to indicate uncertainty.
 """)
-if not filtered_df.empty:
-    region_data = filtered_df.groupby('Date').agg(total_sales=('Price ($)', 'sum')).reset_index()
-    if len(region_data) > 30:
-        region_data = region_data.rename(columns={'Date': 'ds', 'total_sales': 'y'})
-        model = Prophet(changepoint_prior_scale=0.0015, seasonality_prior_scale=10)
-        model.add_seasonality(name='monthly', period=30.5, fourier_order=3)
-        model.add_seasonality(name='quarterly', period=91.25, fourier_order=5)
-        model.add_seasonality(name='yearly', period=365.25, fourier_order=10)
-        try:
-            model.fit(region_data)
-            future = model.make_future_dataframe(periods=730)
-            forecast = model.predict(future)
-            fig6 = plot_plotly(model, forecast)
-            fig6.update_layout(title=f"Revenue Forecast for {region_filter} Region",
-                               xaxis_title="YearQuarter", yaxis_title="Revenue ($)",
-                               hovermode="x unified")
-            st.plotly_chart(fig6, use_container_width=True)
-        except Exception as e:
-            st.error(f"An error occurred while forecasting: {str(e)}")
+def revenue_forecasting():
+    forecast = None
+    backend = st.radio("Forecast engine", options=list(BACKEND_LABELS), format_func=BACKEND_LABELS.get,
+                       horizontal=True, key="forecast_backend",
+                       help="The fast preview fits trend and seasonality with least squares in milliseconds; Prophet is slower but more accurate.")
+    if not filtered_cube.empty:
+        region_data = rollup(filtered_cube, 'Date').rename(columns={'sales': 'total_sales'})
+        if len(region_data) > 30:
+            region_data = region_data.rename(columns={'Date': 'ds', 'total_sales': 'y'})
+            # Fitted models are cached on disk per filter selection, training data and hyperparameters
+            key = cache_key(page='car_sales', region=region_filter, dealer=dealer_filter,
+                            model=car_model_filter, body_style=body_style_filter,
+                            data=frame_fingerprint(region_data), params=PROPHET_PARAMS, periods=730)
+            forecast_chart = st.empty()
+            forecast_status = st.empty()
+            slot = st.session_state.setdefault('forecast_slot', uuid.uuid4().hex) + ':car_sales'
+            try:
+                if backend == 'fast':
+                    # Fitted inline: cheaper than a round trip through the pool and the disk cache
+                    model, forecast = fit_with_backend(region_data, 730, backend='fast')
+                else:
+                    model, forecast = get_forecast_executor().forecast(
+                        slot, key, partial(fit_prophet, periods=730), region_data,
+                        on_wait=show_pending_forecast(region_data, forecast_chart, forecast_status))
+                forecast_status.empty()
+                def build_fig6():
+                    fig6 = plot_forecast(region_data, forecast)
+                    fig6.update_layout(title=f"Revenue Forecast for {region_filter} Region",
+                                       xaxis_title="YearQuarter", yaxis_title="Revenue ($)",
+                                       hovermode="x unified")
+                    return fig6
+                forecast_chart.plotly_chart(cached_figure('fig6', build_fig6, forecast=key, backend=backend),
+                                            use_container_width=True)
+            except Exception as e:
+                st.error(f"An error occurred while forecasting: {str(e)}")
+        else:
+            st.warning("Not enough data points available to forecast for the selected region. Please select a different region.")
     else:
-        st.warning("Not enough data points available to forecast for the selected region. Please select a different region.")
-else:
-    st.warning("No data available for the selected filters. Please choose different filter options.")
-
-st.subheader("Revenue Forecast for 2024")
-forecast_2024 = forecast[(forecast['ds'] >= '2024-01-01') & (forecast['ds'] <= '2024-12-31')]
-forecast_2024['YearMonth'] = forecast_2024['ds'].dt.to_period('M')
-forecast_2024['Month'] = forecast_2024['ds'].dt.strftime('%b')
-monthly_forecast = forecast_2024.groupby('YearMonth').agg(revenue_forecast=('yhat', 'sum')).reset_index()
-monthly_forecast['Month'] = monthly_forecast['YearMonth'].dt.strftime('%b')
-monthly_forecast['Cumulative'] = monthly_forecast['revenue_forecast'].cumsum()
-monthly_forecast['Revenue Forecast ($)'] = monthly_forecast['revenue_forecast'].apply(lambda x: f'${int(x):,}')
-monthly_forecast['Cumulative Revenue ($)'] = monthly_forecast['Cumulative'].apply(lambda x: f'${int(x):,}')
-fig7 = px.line(monthly_forecast, x=monthly_forecast['YearMonth'].dt.to_timestamp(), y='revenue_forecast',
-               markers=True, title="Revenue Forecast for 2024",
-               labels={'x': 'Month', 'revenue_forecast': 'Revenue ($)'}, color_discrete_sequence=["blue"])
-fig7.add_traces(px.area(monthly_forecast, x=monthly_forecast['YearMonth'].dt.to_timestamp(), y='revenue_forecast',
-                        color_discrete_sequence=["skyblue"]).data)
-fig7.update_layout(xaxis_title="Month", yaxis_title="Revenue ($)", hovermode="x unified")
-st.plotly_chart(fig7, use_container_width=True)
-st.write("### Revenue Forecast Table for 2024")
-st.table(monthly_forecast[['YearMonth', 'Month', 'Revenue Forecast ($)', 'Cumulative Revenue ($)']])
+        st.warning("No data available for the selected filters. Please choose different filter options.")
+
+    # The 2024 outlook needs a forecast for the current selection
+    if forecast is None:
+        return
+    st.subheader("Revenue Forecast for 2024")
+    monthly_forecast = period_rollup(forecast, 'month', start='2024-01-01', end='2024-12-31')
+    def build_fig7():
+        fig7 = px.line(monthly_forecast, x='ds', y='forecast',
+                       markers=True, title="Revenue Forecast for 2024",
+                       labels={'ds': 'Month', 'forecast': 'Revenue ($)'}, color_discrete_sequence=["blue"])
+        fig7.add_traces(px.area(monthly_forecast, x='ds', y='forecast',
+                                color_discrete_sequence=["skyblue"]).data)
+        fig7.update_layout(xaxis_title="Month", yaxis_title="Revenue ($)", hovermode="x unified")
+        return fig7
+    st.plotly_chart(cached_figure('fig7', build_fig7, forecast=key, backend=backend), use_container_width=True)
+    st.write("### Revenue Forecast Table for 2024")
+    st.table(forecast_table(monthly_forecast, 'month'))
+
+forecast_section = st.expander("Show revenue forecast", key="section_revenue_forecasting", on_change="rerun")
+if forecast_section.open:
+    with forecast_section:
+        revenue_forecasting()
 
 # ------------------- Key Takeaways -------------------
 st.header("Key Takeaways")
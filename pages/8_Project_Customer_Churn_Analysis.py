@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from utils import chart_reduction
+from utils.churn_model import INPUT_COLUMNS, load_or_fit
+from utils.datasets import load_dataset, snapshot_hash
+from utils.ingest import file_hash
 
 # ------------------- Page Configuration -------------------
 st.set_page_config(page_title="Telco Customer Churn Analysis", layout="wide")
@@ -89,11 +93,28 @@ dataset_url = "https://raw.githubusercontent.com/puravpatel3/portfolio/3d0ea6e6e
 st.markdown(f"[Telco Customer Churn Dataset]({dataset_url})")
 
 @st.cache_data
-def load_data(url):
-    df = pd.read_csv(url)
-    return df
-
-df = load_data(dataset_url)
+def load_data(name, snapshot):
+    # snapshot is only part of the cache key so a changed CSV is picked up
+    return load_dataset(name)
+
+@st.cache_resource
+def get_churn_model(snapshot):
+    # Logistic regression fitted once per dataset snapshot and kept as a JSON artifact
+    return load_or_fit(load_data("telco_churn", snapshot), snapshot)
+
+@st.cache_data(max_entries=8)
+def score_upload(upload_hash, snapshot, _uploaded_file):
+    # Keyed by the upload's content hash and the model's snapshot, so reruns neither rescore nor re-serialize
+    customers = pd.read_csv(_uploaded_file)
+    missing_columns = [c for c in INPUT_COLUMNS if c not in customers.columns]
+    if missing_columns:
+        return None, missing_columns, None
+    scored = get_churn_model(snapshot).score(customers)
+    # Highest risk first for display; the download keeps the uploaded row order
+    return scored.sort_values("Churn_Probability", ascending=False), [], scored.to_csv(index=False)
+
+snapshot = snapshot_hash("telco_churn")
+df = load_data("telco_churn", snapshot)
 
 st.write("### Dataset Preview")
 st.dataframe(df.head(), height=250)
@@ -157,13 +178,14 @@ with col2:
     st.subheader("Charges Comparison by Predicted Churn")
     # Convert Predicted_Churn to string labels for consistency
     filtered_df['Predicted_Churn_str'] = filtered_df['Predicted_Churn'].replace({0: "No", 1: "Yes"})
-    fig2 = px.scatter(filtered_df, x="MonthlyCharges", y="TotalCharges", 
-                      color="Predicted_Churn_str", 
-                      color_discrete_map=churn_palette,
-                      title="Monthly Charges vs. Total Charges",
-                      hover_data={"MonthlyCharges": ":$,.2f", "TotalCharges": ":$,.2f"})
+    fig2, charges_reduction = chart_reduction.scatter(filtered_df, x="MonthlyCharges", y="TotalCharges", 
+                                                      color="Predicted_Churn_str",
+                                                      color_discrete_map=churn_palette,
+                                                      title="Monthly Charges vs. Total Charges",
+                                                      hover_data={"MonthlyCharges": ":$,.2f", "TotalCharges": ":$,.2f"})
     fig2.update_layout(xaxis_title="Monthly Charges ($)", yaxis_title="Total Charges ($)", hovermode="closest")
     st.plotly_chart(fig2, use_container_width=True)
+    st.caption(charges_reduction)
 
 # Visualization 3: Overall Churn Distribution by Tenure Group (Grouped Bars)
 st.subheader("Overall Churn Distribution by Tenure Group")
@@ -176,6 +198,26 @@ fig3 = px.bar(overall_counts, x="tenure_group", y="Count", color="Churn",
 fig3.update_layout(xaxis_title="Tenure Group", yaxis_title="Number of Customers", hovermode="x unified")
 st.plotly_chart(fig3, use_container_width=True)
 
+# ------------------- Score New Customers -------------------
+st.header("Score New Customers")
+churn_model = get_churn_model(snapshot)
+st.markdown("Upload a CSV of customers with the model input features listed above to score their churn risk "
+            "with the logistic regression model. AvgCharges is derived from TotalCharges and tenure when missing.")
+uploaded_customers = st.file_uploader("Upload customers (CSV)", type=["csv"], key="churn_upload")
+if uploaded_customers is not None:
+    scored, missing_columns, scored_csv = score_upload(file_hash(uploaded_customers), snapshot, uploaded_customers)
+    if missing_columns:
+        st.error(f"The file is missing these columns: {', '.join(missing_columns)}")
+    else:
+        at_risk = int(scored["Predicted_Churn"].sum())
+        st.markdown(f"**{len(scored):,}** customers scored, **{at_risk:,}** ({at_risk / max(len(scored), 1):.0%}) "
+                    "predicted to churn. Highest risk first:")
+        st.dataframe(scored.head(1000), height=250)
+        st.download_button("Download scored customers (CSV)", scored_csv,
+                           file_name="scored_customers.csv", mime="text/csv")
+st.caption(f"Model accuracy on the {churn_model.metrics['training_rows']:,} training customers: "
+           f"{churn_model.metrics['training_accuracy']:.1%}.")
+
 # ------------------- Key Takeaways -------------------
 st.header("Key Takeaways")
 st.markdown("""
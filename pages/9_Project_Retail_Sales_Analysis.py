@@ -1,9 +1,18 @@
+import uuid
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from prophet import Prophet
-from prophet.plot import plot_plotly
+from utils import chart_reduction
+from utils.datasets import load_dataset, snapshot_hash
+from utils.facets import Facets
+from utils.figure_cache import FIGURE_CACHE_DIR, FigureCache, figure_key
+from utils.filter_index import FilterIndex
+from utils.forecast_cache import ForecastCache
+from utils.forecast_executor import DEFAULT_MAX_WORKERS, ForecastExecutor
+from utils.forecast_rollups import forecast_table, period_rollup
+from utils.forecasting import BACKEND_LABELS, plot_forecast
+from utils.retail_forecasts import fit_forecast, forecast_key, start_background_warm_up, training_frame
 
 # ------------------- Page Configuration -------------------
 st.set_page_config(
@@ -14,13 +23,51 @@ st.set_page_config(
 
 # ------------------- Helper Functions -------------------
 @st.cache_data
-def load_data(url):
-    df = pd.read_csv(url, parse_dates=['Order Date', 'Ship Date'])
-    return df
+def load_data(name, snapshot):
+    # snapshot is only part of the cache key so a changed CSV is picked up
+    return load_dataset(name)
+
+@st.cache_resource
+def get_filter_index(snapshot):
+    # Bitmaps over the sidebar filter columns, shared by all sessions
+    return FilterIndex(load_data("retail_sales", snapshot),
+                       ["Data Type", "Category", "Ship Mode", "Segment", "Sub-Category"])
+
+@st.cache_resource
+def get_facets(snapshot):
+    return Facets(get_filter_index(snapshot))
+
+@st.cache_resource
+def get_figure_cache():
+    # Built figures shared by all sessions; most visitors keep the default "All" filters
+    return FigureCache(spill_directory=FIGURE_CACHE_DIR)
+
+@st.cache_resource
+def get_forecast_executor():
+    # One bounded pool per server process, shared by all sessions
+    return ForecastExecutor(ForecastCache())
+
+def show_pending_forecast(history, chart, status):
+    # Shows the actuals while the fit runs; each status update also lets Streamlit interrupt on a rerun
+    drawn = []
+    def on_wait(elapsed):
+        if not drawn:
+            chart.plotly_chart(px.line(history, x="ds", y="y", title="Historical Revenue (forecast loading...)",
+                                       labels={"ds": "Date", "y": "Revenue ($)"}), use_container_width=True)
+            drawn.append(True)
+        status.caption(f"Fitting forecast... {elapsed:.0f}s")
+    return on_wait
+
+@st.cache_resource
+def warm_up_forecasts():
+    # Runs once per server process; precomputes every region/filter forecast in the background
+    return start_background_warm_up(workers=DEFAULT_MAX_WORKERS)
 
 # ------------------- Data Loading -------------------
-data_url = "https://raw.githubusercontent.com/puravpatel3/portfolio/55f52c9a729c11496dbcc4a0ff3db811ca2aedb6/files/retail_sales_data_final.csv"
-df = load_data(data_url)
+df = load_data("retail_sales", snapshot_hash("retail_sales"))
+filter_index = get_filter_index(snapshot_hash("retail_sales"))
+facets = get_facets(snapshot_hash("retail_sales"))
+warm_up_forecasts()
 
 # ------------------- Page Title -------------------
 st.title("Retail Supply Chain Sales Analysis & Forecasting")
@@ -98,35 +145,30 @@ with st.expander("Step 4: Forecasting & Advanced Analytics"):
 # ------------------- Sidebar Filters -------------------
 st.sidebar.header("Advanced Filters")
 
-def get_filter_option(label, options):
-    options = ["All"] + sorted(options)
-    selection = st.sidebar.selectbox(label, options, index=0)
+def get_filter_option(label, column, selections):
+    # Cascading: only values that still match the filters above are offered, with their row counts.
+    # The fixed key keeps the current choice when the counts change, as long as it is still available.
+    counts = dict(facets.options(column, selections))
+    options = ["All"] + list(counts)
+    selection = st.sidebar.selectbox(label, options, index=0, key=f"filter_{column}",
+                                     format_func=lambda v: v if v == "All" else f"{v} ({counts[v]:,})")
     return None if selection == "All" else selection
 
 # Using select boxes with an "All" option to reduce clutter
-selected_data_type = get_filter_option("Data Type", df["Data Type"].dropna().unique())
-selected_category = get_filter_option("Product Category", df["Category"].dropna().unique())
-selected_ship_mode = get_filter_option("Ship Mode", df["Ship Mode"].dropna().unique())
-selected_segment = get_filter_option("Segment", df["Segment"].dropna().unique())
-selected_sub_category = get_filter_option("Product Sub-Category", df["Sub-Category"].dropna().unique())
+selections = {}
+selections["Data Type"] = get_filter_option("Data Type", "Data Type", selections)
+selections["Category"] = get_filter_option("Product Category", "Category", selections)
+selections["Ship Mode"] = get_filter_option("Ship Mode", "Ship Mode", selections)
+selections["Segment"] = get_filter_option("Segment", "Segment", selections)
+selections["Sub-Category"] = get_filter_option("Product Sub-Category", "Sub-Category", selections)
 
 # Additional filters for Sales vs. Profit Scatter outlier filtering
 st.sidebar.subheader("Sales vs. Profit Scatter Outlier Filter")
 max_sales_scatter = st.sidebar.number_input("Max Sales for Scatter Plot", value=20000, step=1000)
 max_profit_scatter = st.sidebar.number_input("Max Profit for Scatter Plot", value=5000, step=500)
 
-# Apply filters: if a filter returns None, include all values
-filtered_df = df.copy()
-if selected_data_type is not None:
-    filtered_df = filtered_df[filtered_df["Data Type"] == selected_data_type]
-if selected_category is not None:
-    filtered_df = filtered_df[filtered_df["Category"] == selected_category]
-if selected_ship_mode is not None:
-    filtered_df = filtered_df[filtered_df["Ship Mode"] == selected_ship_mode]
-if selected_segment is not None:
-    filtered_df = filtered_df[filtered_df["Segment"] == selected_segment]
-if selected_sub_category is not None:
-    filtered_df = filtered_df[filtered_df["Sub-Category"] == selected_sub_category]
+# Apply filters in one pass over the bitmap index: a None filter includes all values
+filtered_df = df[filter_index.mask(selections)]
 
 # ------------------- Dataset Preview & Field Descriptions -------------------
 st.header("Dataset Preview")
@@ -186,13 +228,14 @@ with col3:
     scatter_df = filtered_df[(filtered_df["Data Type"]=="Historical") & 
                              (filtered_df["Sales"] <= max_sales_scatter) & 
                              (filtered_df["Profit"] <= max_profit_scatter)]
-    fig_scatter = px.scatter(scatter_df,
-                             x="Sales", y="Profit",
-                             color="Category",
-                             hover_data={"Product Name": True, "Segment": True, "Sales": ":$,.0f", "Profit": ":$,.0f"},
-                             title="Sales vs. Profit by Product Category",
-                             labels={"Sales": "Sales", "Profit": "Profit"})
+    fig_scatter, scatter_reduction = chart_reduction.scatter(scatter_df,
+                                                             x="Sales", y="Profit",
+                                                             color="Category",
+                                                             hover_data={"Product Name": True, "Segment": True, "Sales": ":$,.0f", "Profit": ":$,.0f"},
+                                                             title="Sales vs. Profit by Product Category",
+                                                             labels={"Sales": "Sales", "Profit": "Profit"})
     st.plotly_chart(fig_scatter, use_container_width=True)
+    st.caption(scatter_reduction)
 with col4:
     st.subheader("Sales by Ship Mode")
     df_ship = filtered_df[filtered_df["Data Type"]=="Historical"].groupby("Ship Mode").agg(
@@ -213,52 +256,65 @@ st.markdown("---")
 
 # US Heat Map & Top 10 States Table with toggle for Profit or Revenue
 st.header("US Performance by State")
-col3, col4 = st.columns(2)
-with col3:
-    st.subheader("USA Heat Map")
-    heatmap_metric = st.radio("Color code USA Heatmap by:", options=["Profit", "Revenue"], index=0, horizontal=True)
-    
-    state_profit = filtered_df[filtered_df["Data Type"]=="Historical"].groupby("State").agg(
-        Sales=("Sales", "sum"),
-        Profit=("Profit", "sum")
-    ).reset_index()
-    us_state_abbrev = {
-        'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-        'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC',
-        'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL',
-        'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA',
-        'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
-        'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
-        'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
-        'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
-        'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-        'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-        'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI',
-        'Wyoming': 'WY'
-    }
-    state_profit['state_code'] = state_profit['State'].map(us_state_abbrev)
-    color_field = "Profit" if heatmap_metric == "Profit" else "Sales"
-    fig_heat = px.choropleth(
-        state_profit,
-        locations="state_code",
-        locationmode="USA-states",
-        color=color_field,
-        color_continuous_scale="Viridis",
-        scope="usa",
-        labels={color_field: f"{heatmap_metric}"},
-        hover_data={"Profit": ":$,.0f", "Sales": ":$,.0f"},
-        title=f"Total {heatmap_metric} by State"
-    )
-    st.plotly_chart(fig_heat, use_container_width=True)
-
-with col4:
-    st.subheader("Top 10 States by Profit")
-    state_summary = filtered_df[filtered_df["Data Type"]=="Historical"].groupby("State").agg(
-        Sum_of_Sales=("Sales", "sum"),
-        Sum_of_Profit=("Profit", "sum")
-    ).reset_index().sort_values("Sum_of_Profit", ascending=False).head(10)
-    state_summary = state_summary.style.format({"Sum_of_Sales": "${:,.0f}", "Sum_of_Profit": "${:,.0f}"})
-    st.dataframe(state_summary)
+def state_performance():
+    col3, col4 = st.columns(2)
+    with col3:
+        st.subheader("USA Heat Map")
+        heatmap_metric = st.radio("Color code USA Heatmap by:", options=["Profit", "Revenue"], index=0, horizontal=True)
+
+        def build_heatmap():
+            state_profit = filtered_df[filtered_df["Data Type"]=="Historical"].groupby("State").agg(
+                Sales=("Sales", "sum"),
+                Profit=("Profit", "sum")
+            ).reset_index()
+            us_state_abbrev = {
+                'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+                'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC',
+                'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL',
+                'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA',
+                'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+                'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
+                'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
+                'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
+                'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+                'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+                'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI',
+                'Wyoming': 'WY'
+            }
+            state_profit['state_code'] = state_profit['State'].map(us_state_abbrev)
+            color_field = "Profit" if heatmap_metric == "Profit" else "Sales"
+            fig_heat = px.choropleth(
+                state_profit,
+                locations="state_code",
+                locationmode="USA-states",
+                color=color_field,
+                color_continuous_scale="Viridis",
+                scope="usa",
+                labels={color_field: f"{heatmap_metric}"},
+                hover_data={"Profit": ":$,.0f", "Sales": ":$,.0f"},
+                title=f"Total {heatmap_metric} by State"
+            )
+            return fig_heat
+        # Keyed by the filters, metric and data snapshot; the aggregation and choropleth only run on a miss
+        fig_heat = get_figure_cache().get_or_build(
+            figure_key("retail_sales", "fig_heat", dict(selections, metric=heatmap_metric), snapshot_hash("retail_sales")),
+            build_heatmap)
+        st.plotly_chart(fig_heat, use_container_width=True)
+
+    with col4:
+        st.subheader("Top 10 States by Profit")
+        state_summary = filtered_df[filtered_df["Data Type"]=="Historical"].groupby("State").agg(
+            Sum_of_Sales=("Sales", "sum"),
+            Sum_of_Profit=("Profit", "sum")
+        ).reset_index().sort_values("Sum_of_Profit", ascending=False).head(10)
+        state_summary = state_summary.style.format({"Sum_of_Sales": "${:,.0f}", "Sum_of_Profit": "${:,.0f}"})
+        st.dataframe(state_summary)
+
+# Below-the-fold sections only run while expanded; their figures and forecasts stay cached afterwards
+state_section = st.expander("Show state heat map and top states", key="section_state_performance", on_change="rerun")
+if state_section.open:
+    with state_section:
+        state_performance()
 
 st.markdown("---")
 
@@ -269,49 +325,56 @@ st.markdown("""
 This interactive time series forecast predicts revenue trends for a selected region over the next year based on historical data.  
 By analyzing past sales performance and projecting future revenue (with confidence intervals), this forecast enables proactive decisions on inventory, staffing, and advertising.
 """)
-region_options = ["All"] + sorted(filtered_df["Region"].dropna().unique().tolist())
-selected_region_forecast = st.selectbox("Select a Region for Forecasting", options=region_options, index=0)
-
-if selected_region_forecast == "All":
-    region_df = filtered_df[filtered_df["Data Type"] == "Historical"]
-else:
-    region_df = filtered_df[(filtered_df["Region"] == selected_region_forecast) & (filtered_df["Data Type"] == "Historical")]
-
-filter_outliers = st.checkbox("Filter out Outliers (Exclude days with revenue > $10,000)", value=False)
-
-region_data = region_df.groupby("Order Date").agg(
-    total_sales=("Sales", "sum"),
-    avg_discount=("Discount", "mean")
-).reset_index()
-region_data = region_data.rename(columns={"Order Date": "ds", "total_sales": "y", "avg_discount": "discount"})
-
-if filter_outliers:
-    region_data = region_data[region_data["y"] <= 10000]
-
-if not region_data.empty and len(region_data) > 30:
-    model = Prophet(changepoint_prior_scale=0.0015, seasonality_prior_scale=10)
-    model.add_seasonality(name="monthly", period=30.5, fourier_order=3)
-    model.add_seasonality(name="quarterly", period=91.25, fourier_order=5)
-    model.add_seasonality(name="yearly", period=365.25, fourier_order=10)
-    model.add_regressor("discount")
-    try:
-        model.fit(region_data)
-        future = model.make_future_dataframe(periods=365)
-        future["discount"] = region_data["discount"].mean()
-        forecast = model.predict(future)
-        fig_forecast = plot_plotly(model, forecast)
-        fig_forecast.update_layout(
-            title=f"Revenue Forecast for {selected_region_forecast} Region",
-            xaxis_title="Date", 
-            yaxis_title="Revenue ($)",
-            yaxis_tickformat="$,.0f",
-            hovermode="x unified"
-        )
-        st.plotly_chart(fig_forecast, use_container_width=True)
-    except Exception as e:
-        st.error(f"An error occurred while forecasting: {str(e)}")
-else:
-    st.warning("Not enough data points available to forecast for the selected region. Please select a different region.")
+def revenue_forecasting():
+    region_options = ["All"] + sorted(filtered_df["Region"].dropna().unique().tolist())
+    selected_region_forecast = st.selectbox("Select a Region for Forecasting", options=region_options, index=0)
+
+    filter_outliers = st.checkbox("Filter out Outliers (Exclude days with revenue > $10,000)", value=False)
+    backend = st.radio("Forecast engine", options=list(BACKEND_LABELS), format_func=BACKEND_LABELS.get,
+                       horizontal=True, key="forecast_backend",
+                       help="The fast preview fits trend and seasonality with least squares in milliseconds; Prophet is slower but more accurate.")
+
+    region_data = training_frame(filtered_df, selected_region_forecast, filter_outliers)
+
+    if not region_data.empty and len(region_data) > 30:
+        forecast_chart = st.empty()
+        forecast_status = st.empty()
+        slot = st.session_state.setdefault("forecast_slot", uuid.uuid4().hex) + ":retail_sales"
+        try:
+            if backend == "fast":
+                # Fitted inline: cheaper than a round trip through the pool and the disk cache
+                model, forecast = fit_forecast(region_data, backend="fast")
+            else:
+                # Served from the precomputed forecasts; only fits live when the selection was not warmed up
+                model, forecast = get_forecast_executor().forecast(
+                    slot, forecast_key(region_data), fit_forecast, region_data,
+                    on_wait=show_pending_forecast(region_data, forecast_chart, forecast_status))
+            forecast_status.empty()
+            fig_forecast = plot_forecast(region_data, forecast)
+            fig_forecast.update_layout(
+                title=f"Revenue Forecast for {selected_region_forecast} Region",
+                xaxis_title="Date", 
+                yaxis_title="Revenue ($)",
+                yaxis_tickformat="$,.0f",
+                hovermode="x unified"
+            )
+            forecast_chart.plotly_chart(fig_forecast, use_container_width=True)
+
+            # Quarterly totals over the forecast horizon (the days after the last actual), full quarters only
+            st.write("### Quarterly Revenue Forecast")
+            quarterly_forecast = period_rollup(forecast, 'quarter', start=region_data["ds"].max() + pd.Timedelta(days=1),
+                                               complete=True)
+            st.table(forecast_table(quarterly_forecast, 'quarter'))
+            st.caption("Full calendar quarters only; partial quarters at either end of the forecast horizon are left out.")
+        except Exception as e:
+            st.error(f"An error occurred while forecasting: {str(e)}")
+    else:
+        st.warning("Not enough data points available to forecast for the selected region. Please select a different region.")
+
+forecast_section = st.expander("Show revenue forecast", key="section_revenue_forecasting", on_change="rerun")
+if forecast_section.open:
+    with forecast_section:
+        revenue_forecasting()
 
 # ------------------- Key Takeaways -------------------
 st.header("Key Takeaways")
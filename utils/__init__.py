@@ -0,0 +1,8 @@
+"""Shared data, caching and forecasting helpers used by the portfolio pages."""
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES_DIR = os.path.join(ROOT_DIR, "files")
+
+# Generated artifacts (dataset snapshots, model caches) live outside of files/
+CACHE_DIR = os.environ.get("PORTFOLIO_CACHE_DIR", os.path.join(ROOT_DIR, ".cache"))
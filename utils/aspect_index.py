@@ -0,0 +1,63 @@
+"""Term index over the review aspects for filter-dependent word clouds.
+
+The `refined_aspects` strings are tokenized once, the way WordCloud.generate
+tokenizes text (lowercased words, trailing 's and numbers dropped, stopwords
+removed, plurals folded into their singular), into a sparse row x term count
+table. The term frequencies of any filtered subset of rows are then one
+weighted bincount over that table, ready for WordCloud.generate_from_frequencies,
+and the count vector's hash identifies the rendered cloud.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS
+
+TOKEN_PATTERN = r"\w[\w']*"
+
+
+class AspectIndex:
+    """Per-row term counts of a text column, stored as parallel row/term/count arrays."""
+
+    def __init__(self, texts):
+        texts = pd.Series(texts).reset_index(drop=True)
+        tokens = texts.dropna().astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        tokens = tokens.str.replace(r"'s$", "", regex=True)
+        stopwords = {word.lower() for word in STOPWORDS}
+        tokens = tokens[~tokens.str.isdigit() & ~tokens.isin(stopwords) & (tokens != "")]
+
+        terms = pd.Series(tokens.unique(), dtype=object)
+        # Fold "boxes"-style plurals into a singular that also occurs, as WordCloud does
+        singular = terms.str[:-1]
+        plural = terms.str.endswith("s") & ~terms.str.endswith("ss") & singular.isin(set(terms))
+        canonical = terms.where(~plural, singular)
+        self.vocabulary = np.asarray(canonical.unique(), dtype=object)
+        term_ids = pd.Index(self.vocabulary).get_indexer(tokens.map(dict(zip(terms, canonical))))
+
+        pairs = pd.DataFrame({"row": tokens.index.to_numpy(), "term": term_ids})
+        counted = pairs.groupby(["row", "term"]).size().reset_index(name="count")
+        self.rows = counted["row"].to_numpy()
+        self.terms = counted["term"].to_numpy()
+        self.counts = counted["count"].to_numpy(dtype=np.int64)
+        self.n_rows = len(texts)
+
+    def term_counts(self, positions=None):
+        """Dense count vector over the vocabulary for the rows at `positions` (all rows if None)."""
+        if positions is None:
+            terms, counts = self.terms, self.counts
+        else:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[positions] = True
+            keep = selected[self.rows]
+            terms, counts = self.terms[keep], self.counts[keep]
+        return np.bincount(terms, weights=counts, minlength=len(self.vocabulary)).astype(np.int64)
+
+    def frequencies(self, term_counts):
+        """{term: count} of the non-zero entries, as WordCloud.generate_from_frequencies takes it."""
+        present = np.flatnonzero(term_counts)
+        return dict(zip(self.vocabulary[present], term_counts[present].tolist()))
+
+
+def counts_key(term_counts):
+    """Short hash of a count vector; equal selections of aspects share a rendered cloud."""
+    return hashlib.sha256(np.ascontiguousarray(term_counts, dtype=np.int64).tobytes()).hexdigest()[:16]
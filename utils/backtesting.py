@@ -0,0 +1,159 @@
+"""Rolling-origin backtests for the forecasting backends.
+
+Each configuration (a backend plus Prophet-style hyperparameters) is evaluated
+on folds that train on everything before a cutoff and score the following
+`horizon` days, moving the cutoff back `horizon` days per fold. Folds run in a
+process pool; each fold's metrics (MAPE, RMSE) and wall-clock fit time are
+cached on disk by a hash of the fold's training and holdout data and the
+configuration, so re-running a grid only fits the new cells.
+
+Run it directly with, for example:
+
+    python -m utils.backtesting car_sales --backend prophet fast --changepoint-prior-scale 0.0015 0.05
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils import CACHE_DIR, retail_forecasts
+from utils.car_cube import load_cube, rollup
+from utils.datasets import load_dataset
+from utils.forecast_cache import cache_key, frame_fingerprint
+from utils.forecasting import PROPHET_PARAMS, fit_with_backend
+from utils.pools import process_pool
+
+BACKTEST_CACHE_DIR = os.path.join(CACHE_DIR, "backtests")
+HORIZON_DAYS = 90
+N_FOLDS = 4
+MIN_TRAINING_DAYS = 180
+
+
+def dataset_series(dataset):
+    """Daily ds/y (plus regressors) training frame of a whole dataset, as the pages build it."""
+    if dataset == "car_sales":
+        return rollup(load_cube(), "Date").rename(columns={"Date": "ds", "sales": "y"})
+    if dataset == "retail_sales":
+        return retail_forecasts.training_frame(load_dataset("retail_sales"))
+    raise ValueError(f"No backtest series for {dataset}")
+
+
+def fold_cutoffs(series, horizon=HORIZON_DAYS, n_folds=N_FOLDS):
+    """Cutoff dates, oldest first, each followed by `horizon` days of test data."""
+    last = series["ds"].max()
+    cutoffs = [last - pd.Timedelta(days=horizon * k) for k in range(n_folds, 0, -1)]
+    return [c for c in cutoffs if (series["ds"] <= c).sum() >= MIN_TRAINING_DAYS]
+
+
+def _metrics(actual, predicted):
+    errors = predicted - actual
+    nonzero = actual != 0
+    mape = float(np.mean(np.abs(errors[nonzero] / actual[nonzero])) * 100) if nonzero.any() else np.nan
+    return mape, float(np.sqrt(np.mean(errors ** 2)))
+
+
+def _run_fold(train, test, backend, params, regressors, horizon, path):
+    # Runs in a worker process and stores the result before returning it
+    start = time.perf_counter()
+    _, forecast = fit_with_backend(train, horizon, backend=backend, params=params, regressors=regressors)
+    seconds = time.perf_counter() - start
+    scored = test.merge(forecast[["ds", "yhat"]], on="ds", how="inner")
+    mape, rmse = _metrics(scored["y"].to_numpy(dtype=float), scored["yhat"].to_numpy(dtype=float))
+    result = {"mape": mape, "rmse": rmse, "fit_seconds": seconds, "test_days": len(scored)}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+    return result
+
+
+def backtest(series, configs, horizon=HORIZON_DAYS, n_folds=N_FOLDS, regressors=(), workers=None,
+             cache_dir=BACKTEST_CACHE_DIR, log=print):
+    """Score every {"name", "backend", "params"} config on rolling-origin folds of `series`.
+
+    Returns (folds, summary): one row per config and fold with MAPE, RMSE and
+    fit seconds, and the per-config means.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    rows, jobs = [], []
+    for cutoff in fold_cutoffs(series, horizon, n_folds):
+        train = series[series["ds"] <= cutoff].reset_index(drop=True)
+        test = series[(series["ds"] > cutoff) & (series["ds"] <= cutoff + pd.Timedelta(days=horizon))]
+        # The holdout is part of the key too: changed actuals in it change the error metrics
+        data, holdout = frame_fingerprint(train), frame_fingerprint(test)
+        for config in configs:
+            key = cache_key(data=data, holdout=holdout, backend=config["backend"], params=config["params"],
+                            regressors=list(regressors), horizon=horizon)
+            path = os.path.join(cache_dir, f"{key}.json")
+            row = {"config": config["name"], "cutoff": cutoff, "train_days": len(train)}
+            rows.append(row)
+            try:
+                with open(path) as f:
+                    row.update(json.load(f), cached=True)
+            except (OSError, ValueError):
+                jobs.append((row, train, test, config, path))
+
+    log(f"Backtesting {len(configs)} configs: {len(jobs)} of {len(rows)} folds to fit...")
+    start = time.perf_counter()
+    with process_pool(workers) as pool:
+        futures = {pool.submit(_run_fold, train, test, config["backend"], config["params"], tuple(regressors),
+                               horizon, path): row
+                   for row, train, test, config, path in jobs}
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                row.update(future.result(), cached=False)
+            except Exception as e:
+                row.update(error=str(e), cached=False)
+    log(f"Done in {time.perf_counter() - start:.1f}s.")
+
+    folds = pd.DataFrame(rows)
+    summary = folds.groupby("config", sort=False).agg(
+        folds=("cutoff", "size"),
+        mape=("mape", "mean"),
+        rmse=("rmse", "mean"),
+        fit_seconds=("fit_seconds", "mean")
+    ).reset_index() if "mape" in folds else pd.DataFrame()
+    return folds, summary
+
+
+def grid_configs(backends, changepoint_prior_scales, seasonality_prior_scales):
+    """Configs for every backend x hyperparameter combination, based on PROPHET_PARAMS."""
+    configs = []
+    for backend in backends:
+        for changepoint in changepoint_prior_scales:
+            for seasonality in seasonality_prior_scales:
+                params = dict(PROPHET_PARAMS, changepoint_prior_scale=changepoint,
+                              seasonality_prior_scale=seasonality)
+                # The fast engine ignores both priors, so one config per backend is enough
+                name = backend if backend == "fast" else f"{backend} cps={changepoint} sps={seasonality}"
+                if all(c["name"] != name for c in configs):
+                    configs.append({"name": name, "backend": backend, "params": params})
+    return configs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of forecast configurations.")
+    parser.add_argument("dataset", choices=["car_sales", "retail_sales"])
+    parser.add_argument("--backend", nargs="+", default=["prophet"], choices=["prophet", "fast"])
+    parser.add_argument("--changepoint-prior-scale", nargs="+", type=float,
+                        default=[PROPHET_PARAMS["changepoint_prior_scale"]])
+    parser.add_argument("--seasonality-prior-scale", nargs="+", type=float,
+                        default=[PROPHET_PARAMS["seasonality_prior_scale"]])
+    parser.add_argument("--horizon", type=int, default=HORIZON_DAYS, help="days scored after each cutoff")
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", default=None, help="write the per-fold results to this .csv")
+    args = parser.parse_args()
+
+    regressors = retail_forecasts.REGRESSORS if args.dataset == "retail_sales" else ()
+    configs = grid_configs(args.backend, args.changepoint_prior_scale, args.seasonality_prior_scale)
+    folds, summary = backtest(dataset_series(args.dataset), configs, horizon=args.horizon, n_folds=args.folds,
+                              regressors=regressors, workers=args.workers)
+    if args.output:
+        folds.to_csv(args.output, index=False)
+    print(summary.to_string(index=False))
@@ -0,0 +1,221 @@
+"""Batch forecasts for every segment of a dataset in one job.
+
+Given a segmentation key (e.g. Dealer_Region, Dealer_Name or Model for car
+sales; Region and/or Category for retail sales), the daily training series of
+all segments are built in a single grouped aggregation, fitted in parallel
+across a process pool and returned as one long-format forecast table plus a
+per-segment fit report. Fits go through the shared forecast cache with the same
+keys the pages use, so a morning batch also warms the interactive pages.
+
+With `incremental=True` a manifest remembers each segment's last cache key.
+Segments whose training data fingerprint is unchanged are skipped; only those
+whose data changed (e.g. new daily rows) are refit, from scratch, so a forecast
+depends on its training data alone and not on earlier runs.
+
+Run it directly with, for example:
+
+    python -m utils.batch_forecasts car_sales --by Dealer_Name --workers 8 --output dealer_forecasts.parquet
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from functools import partial
+
+import pandas as pd
+
+from utils import CACHE_DIR, retail_forecasts
+from utils.car_cube import CATEGORICAL_DIMENSIONS, load_cube
+from utils.datasets import load_dataset
+from utils.forecast_cache import ForecastCache, cache_key, frame_fingerprint
+from utils.forecasting import PROPHET_PARAMS, fit_prophet
+from utils.pools import process_pool
+
+MANIFEST_DIR = os.path.join(CACHE_DIR, "forecast_manifests")
+CAR_FORECAST_PERIODS = 730
+MIN_TRAINING_DAYS = 30
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+# Car page filter names for each cube dimension, used to build page-compatible cache keys
+CAR_KEY_NAMES = {"Dealer_Region": "region", "Dealer_Name": "dealer", "Model": "model", "Body Style": "body_style"}
+
+
+def _car_daily(by):
+    daily = load_cube().groupby(by + ["Date"], observed=True)["sales"].sum().reset_index()
+    return daily.rename(columns={"Date": "ds", "sales": "y"})
+
+
+def _car_key(segment, frame):
+    filters = {name: segment.get(column, "All") for column, name in CAR_KEY_NAMES.items()}
+    return cache_key(page="car_sales", **filters, data=frame_fingerprint(frame),
+                     params=PROPHET_PARAMS, periods=CAR_FORECAST_PERIODS)
+
+
+def _retail_daily(by):
+    df = load_dataset("retail_sales")
+    historical = df[df["Data Type"] == "Historical"]
+    daily = historical.groupby(by + ["Order Date"], observed=True).agg(
+        y=("Sales", "sum"),
+        discount=("Discount", "mean")
+    ).reset_index()
+    return daily.rename(columns={"Order Date": "ds"})
+
+
+def _retail_key(segment, frame):
+    return retail_forecasts.forecast_key(frame)
+
+
+# dataset -> how to build the daily series, key and fit one segment
+SEGMENTATIONS = {
+    "car_sales": {
+        "dimensions": CATEGORICAL_DIMENSIONS,
+        "daily": _car_daily,
+        "columns": ["ds", "y"],
+        "key": _car_key,
+        "fit": partial(fit_prophet, periods=CAR_FORECAST_PERIODS),
+    },
+    "retail_sales": {
+        "dimensions": ["Region", "Category", "Segment", "Ship Mode", "Sub-Category"],
+        "daily": _retail_daily,
+        "columns": ["ds", "y", "discount"],
+        "key": _retail_key,
+        "fit": retail_forecasts.fit_forecast,
+    },
+}
+
+
+def segment_frames(dataset, by):
+    """Yield (segment dict, daily training frame) for every segment, from one grouped aggregation."""
+    spec = SEGMENTATIONS[dataset]
+    unknown = set(by) - set(spec["dimensions"])
+    if unknown:
+        raise ValueError(f"Cannot segment {dataset} by {sorted(unknown)}; choose from {spec['dimensions']}")
+    daily = spec["daily"](list(by))
+    for values, frame in daily.groupby(list(by), observed=True, sort=True):
+        segment = dict(zip(by, values if isinstance(values, tuple) else (values,)))
+        yield segment, frame[spec["columns"]].sort_values("ds").reset_index(drop=True)
+
+
+def _fit_segment(dataset, key, frame, cache_dir):
+    # Runs in a worker process; returns (trimmed forecast, fit seconds, status)
+    cache = ForecastCache(cache_dir)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[1][FORECAST_COLUMNS], 0.0, "cached"
+    start = time.perf_counter()
+    model, forecast = SEGMENTATIONS[dataset]["fit"](frame)
+    seconds = time.perf_counter() - start
+    cache.put(key, model, forecast)
+    return forecast[FORECAST_COLUMNS], seconds, "fitted"
+
+
+def _manifest_path(dataset, by):
+    return os.path.join(MANIFEST_DIR, f"{dataset}-{'+'.join(by)}.json")
+
+
+def _load_manifest(dataset, by):
+    try:
+        with open(_manifest_path(dataset, by)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(dataset, by, manifest):
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    path = _manifest_path(dataset, by)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _segment_id(segment):
+    return json.dumps([str(v) for v in segment.values()])
+
+
+def _long_format(forecast, frame, segment):
+    forecast = forecast.assign(is_forecast=forecast["ds"] > frame["ds"].max())
+    for column, value in reversed(list(segment.items())):
+        forecast.insert(0, column, value)
+    return forecast
+
+
+def batch_forecast(dataset, by, workers=None, cache=None, log=print, incremental=False):
+    """Forecast every segment of `dataset` split by the `by` columns.
+
+    Returns (forecasts, report): forecasts is long-format with the segment
+    columns, ds, yhat, yhat_lower, yhat_upper and is_forecast (True past the
+    segment's last actual); report has one row per segment with its training
+    days, status and fit seconds. In incremental mode unchanged segments are
+    reported as "unchanged" and only changed ones are refit.
+    """
+    by = list(by)
+    cache = cache or ForecastCache()
+    key_for = SEGMENTATIONS[dataset]["key"]
+    manifest = _load_manifest(dataset, by) if incremental else {}
+
+    report, jobs, forecasts = [], [], []
+    for segment, frame in segment_frames(dataset, by):
+        row = dict(segment, training_days=len(frame), status="skipped: too little data", fit_seconds=0.0)
+        report.append(row)
+        if len(frame) <= MIN_TRAINING_DAYS:
+            continue
+        key = key_for(segment, frame)
+        if manifest.get(_segment_id(segment)) == key:
+            # Same training data fingerprint as the last run: no refit, reuse the stored forecast
+            cached = cache.get(key)
+            if cached is not None:
+                row["status"] = "unchanged"
+                forecasts.append(_long_format(cached[1][FORECAST_COLUMNS], frame, segment))
+                continue
+        jobs.append((row, segment, key, frame))
+
+    log(f"Forecasting {len(jobs)} of {len(report)} {dataset} segments by {', '.join(by)}...")
+    start = time.perf_counter()
+    with process_pool(workers) as pool:
+        futures = {pool.submit(_fit_segment, dataset, key, frame, cache.directory): (row, segment, key, frame)
+                   for row, segment, key, frame in jobs}
+        for future in as_completed(futures):
+            row, segment, key, frame = futures[future]
+            try:
+                forecast, seconds, status = future.result()
+            except Exception as e:
+                row["status"] = f"failed: {e}"
+                continue
+            row["status"] = status
+            row["fit_seconds"] = round(seconds, 3)
+            manifest[_segment_id(segment)] = key
+            forecasts.append(_long_format(forecast, frame, segment))
+    log(f"Done in {time.perf_counter() - start:.1f}s.")
+    if incremental:
+        _save_manifest(dataset, by, manifest)
+
+    report = pd.DataFrame(report)
+    if forecasts:
+        forecasts = pd.concat(forecasts, ignore_index=True).sort_values(by + ["ds"], ignore_index=True)
+    else:
+        forecasts = pd.DataFrame(columns=by + FORECAST_COLUMNS + ["is_forecast"])
+    return forecasts, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast every segment of a dataset in one batch.")
+    parser.add_argument("dataset", choices=sorted(SEGMENTATIONS))
+    parser.add_argument("--by", nargs="+", required=True, help="segmentation columns, e.g. Dealer_Name")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", default=None, help="write the long-format forecasts to this .parquet or .csv")
+    parser.add_argument("--report", default=None, help="write the per-segment fit report to this .csv")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip segments whose data is unchanged since the last incremental run")
+    args = parser.parse_args()
+
+    forecasts, report = batch_forecast(args.dataset, args.by, workers=args.workers, incremental=args.incremental)
+    if args.output:
+        if args.output.endswith(".csv"):
+            forecasts.to_csv(args.output, index=False)
+        else:
+            forecasts.to_parquet(args.output, index=False)
+    if args.report:
+        report.to_csv(args.report, index=False)
+    print(report.to_string(index=False))
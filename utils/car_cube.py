@@ -0,0 +1,66 @@
+"""Pre-aggregated daily sales cube for the car sales page.
+
+Raw sales rows are summed once per (Date, Dealer_Region, Dealer_Name, Model,
+Body Style) cell, with categorical dimension columns. Every chart on the page is
+then a filter plus roll-up over the cube instead of a rescan of the raw rows.
+The cube is persisted next to the dataset snapshot it was built from, and the
+sidebar filters select cube cells through a FilterIndex over the categorical
+dimensions.
+"""
+import glob
+import os
+import threading
+
+import pandas as pd
+
+from utils import CACHE_DIR
+from utils.datasets import load_dataset, snapshot_hash
+
+CUBE_DIR = os.path.join(CACHE_DIR, "cubes")
+DIMENSIONS = ["Date", "Dealer_Region", "Dealer_Name", "Model", "Body Style"]
+CATEGORICAL_DIMENSIONS = DIMENSIONS[1:]
+
+
+def build_cube(df):
+    """Aggregate raw car sales rows into the daily cube (sales in $ and units sold)."""
+    cube = df.groupby(DIMENSIONS, observed=True).agg(
+        sales=("Price ($)", "sum"),
+        units=("Price ($)", "size")
+    ).reset_index()
+    for column in CATEGORICAL_DIMENSIONS:
+        cube[column] = cube[column].astype("category")
+    return cube
+
+
+def load_cube():
+    """Load the cube for the current car sales snapshot, building it on first use."""
+    path = os.path.join(CUBE_DIR, f"car_sales-{snapshot_hash('car_sales')}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path, memory_map=True)
+
+    cube = build_cube(load_dataset("car_sales", columns=DIMENSIONS + ["Price ($)"]))
+    os.makedirs(CUBE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    # Cubes of earlier snapshots are never read again
+    for stale in glob.glob(os.path.join(CUBE_DIR, "car_sales-*.parquet")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return cube
+
+
+def rollup(cube, by, value="sales"):
+    """Sum a cube measure over the given dimension(s), dropping empty categories."""
+    return cube.groupby(by, observed=True)[value].sum().reset_index()
+
+
+def quarterly_rollup(cube, value="sales"):
+    """Sum a measure per YearQuarter label (e.g. 2022Q1), computed on the distinct dates only."""
+    daily = rollup(cube, "Date", value)
+    daily["YearQuarter"] = daily["Date"].dt.year.astype(str) + "Q" + daily["Date"].dt.quarter.astype(str)
+    return daily.groupby("YearQuarter")[value].sum().reset_index()
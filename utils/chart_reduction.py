@@ -0,0 +1,141 @@
+"""Server-side data reduction for large Plotly charts.
+
+Thin wrappers around plotly.express that cap what is sent to the browser:
+line series above `max_points` are downsampled with Largest-Triangle-Three-
+Buckets, scatters above BIN_POINTS are aggregated into one shared grid of 2D
+bins drawn as tiles sized by their row count, and bars over many rows are
+pre-aggregated. Smaller scatters keep every point and its hover fields, drawn
+with WebGL above WEBGL_POINTS markers. Each wrapper
+returns (figure, caption) so the page can report how the data was reduced.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+MAX_POINTS = 5_000
+# Scatters up to this size are drawn point by point with WebGL
+BIN_POINTS = 100_000
+WEBGL_POINTS = 1_000
+BINS = 80
+
+
+def _as_numbers(values):
+    """Float view of a numeric or datetime Series, or None for other types."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("int64").astype(np.float64).to_numpy()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return None
+
+
+def lttb(x, y, n_out):
+    """Indices of the n_out points that Largest-Triangle-Three-Buckets keeps from sorted x, y."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the end points
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's mean
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return keep
+
+
+def line(df, x, y, color=None, max_points=MAX_POINTS, **kwargs):
+    """px.line with each series downsampled to at most max_points (split across colors) via LTTB."""
+    data = df.dropna(subset=[x, y]).sort_values(x)
+    groups = [data] if color is None else [g for _, g in data.groupby(color, observed=True, sort=False)]
+    budget = max(3, max_points // max(len(groups), 1))
+    if len(data) <= max_points or _as_numbers(data[y]) is None:
+        return px.line(data, x=x, y=y, color=color, **kwargs), f"Showing all {len(data):,} points."
+
+    reduced = []
+    for group in groups:
+        x_values = _as_numbers(group[x])
+        if x_values is None:
+            x_values = np.arange(len(group), dtype=np.float64)
+        reduced.append(group.iloc[lttb(x_values, _as_numbers(group[y]), budget)])
+    reduced = pd.concat(reduced)
+    caption = f"Line downsampled with LTTB from {len(data):,} to {len(reduced):,} points."
+    return px.line(reduced, x=x, y=y, color=color, **kwargs), caption
+
+
+def _bin_edges(values, bins):
+    low, high = np.nanmin(values), np.nanmax(values)
+    if low == high:
+        high = low + 1
+    return np.linspace(low, high, bins + 1)
+
+
+def scatter(df, x, y, color=None, max_points=BIN_POINTS, bins=BINS, **kwargs):
+    """px.scatter that bins inputs above max_points into a bins x bins grid of count-sized tiles."""
+    data = df.dropna(subset=[x, y])
+    n = len(data)
+    if n <= max_points:
+        render_mode = "webgl" if n > WEBGL_POINTS else "auto"
+        fig = px.scatter(data, x=x, y=y, color=color, render_mode=render_mode, **kwargs)
+        return fig, f"Showing all {n:,} points" + (" (WebGL)." if render_mode == "webgl" else ".")
+
+    x_values, y_values = _as_numbers(data[x]), _as_numbers(data[y])
+    if x_values is None or y_values is None:
+        # Categorical axes cannot be binned; fall back to a uniform sample
+        sample = data.sample(max_points, random_state=0)
+        fig = px.scatter(sample, x=x, y=y, color=color, render_mode="webgl", **kwargs)
+        return fig, f"Showing a random sample of {max_points:,} of {n:,} points (WebGL)."
+
+    x_edges, y_edges = _bin_edges(x_values, bins), _bin_edges(y_values, bins)
+    cells = pd.DataFrame({
+        "x_bin": np.clip(np.searchsorted(x_edges, x_values, side="right") - 1, 0, bins - 1),
+        "y_bin": np.clip(np.searchsorted(y_edges, y_values, side="right") - 1, 0, bins - 1),
+    }, index=data.index)
+    tiles = cells.groupby(["x_bin", "y_bin"]).size().reset_index(name="Rows")
+    if color is not None:
+        # One tile per cell on the shared grid, colored by its most common category
+        cells[color] = data[color]
+        by_color = cells.groupby(["x_bin", "y_bin", color], observed=True).size().reset_index(name="n")
+        majority = by_color.sort_values("n", ascending=False, kind="stable").drop_duplicates(["x_bin", "y_bin"])
+        tiles = tiles.merge(majority[["x_bin", "y_bin", color]], on=["x_bin", "y_bin"], how="left")
+    tiles[x] = (x_edges[tiles["x_bin"]] + x_edges[tiles["x_bin"] + 1]) / 2
+    tiles[y] = (y_edges[tiles["y_bin"]] + y_edges[tiles["y_bin"] + 1]) / 2
+    for column in (x, y):
+        if pd.api.types.is_datetime64_any_dtype(data[column]):
+            tiles[column] = pd.to_datetime(tiles[column].astype("int64"))
+
+    # Per-row hover fields do not exist for tiles; keep only the axis formats
+    hover_data = kwargs.pop("hover_data", None)
+    hover = {"Rows": ":,d"}
+    if isinstance(hover_data, dict):
+        hover.update({k: v for k, v in hover_data.items() if k in (x, y)})
+    fig = px.scatter(tiles, x=x, y=y, color=color, size="Rows", hover_data=hover,
+                     render_mode="webgl" if len(tiles) > WEBGL_POINTS else "auto", **kwargs)
+    fig.update_traces(marker=dict(symbol="square", sizemode="area"))
+    caption = f"Binned {n:,} points into {len(tiles):,} tiles ({bins}x{bins} grid); tile size shows the row count"
+    caption += f", tile color its most common {color}." if color is not None else "."
+    return fig, caption
+
+
+def bar(df, x, y, max_points=MAX_POINTS, **kwargs):
+    """px.bar that sums (or counts, for non-numeric y) rows per x value when there are many rows."""
+    if len(df) <= max_points:
+        return px.bar(df, x=x, y=y, **kwargs), f"Showing all {len(df):,} rows."
+
+    # Plotly stacks one segment per row, so the per-x total draws the same bar height
+    if _as_numbers(df[y]) is not None and not pd.api.types.is_datetime64_any_dtype(df[y]):
+        totals = df.groupby(x, observed=True)[y].sum()
+        how = "summed"
+    else:
+        totals = df.groupby(x, observed=True)[y].count()
+        how = "counted"
+    caption = f"{len(df):,} rows {how} into {len(totals):,} bars."
+    if len(totals) > max_points:
+        totals = totals.nlargest(max_points)
+        caption += f" Showing the {max_points:,} largest."
+    return px.bar(totals.reset_index(), x=x, y=y, **kwargs), caption
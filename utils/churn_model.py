@@ -0,0 +1,246 @@
+"""Logistic regression churn model fitted and scored with NumPy.
+
+The model uses the churn page's input features: standardized numeric columns
+plus one-hot encoded categorical ones, with an L2 penalty like scikit-learn's
+default LogisticRegression. It is fitted by Newton's method (IRLS) and saved as
+a small JSON artifact holding the intercept, each numeric column's mean,
+standard deviation and coefficient, and each categorical level's coefficient.
+
+Scoring never builds a one-hot matrix: every categorical column is mapped to
+level codes and its coefficients are gathered by code, so a batch is a handful
+of vectorized array operations. Unknown levels and missing values contribute
+nothing (the training mean, for numeric columns).
+
+Run it directly with, for example:
+
+    python -m utils.churn_model fit --output churn_model.json
+    python -m utils.churn_model score customers.csv --model churn_model.json --output scored.parquet
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import CACHE_DIR
+from utils.datasets import load_dataset
+from utils.ingest import CHUNK_ROWS
+
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+NUMERIC_FEATURES = ["tenure", "MonthlyCharges", "TotalCharges", "AvgCharges", "SeniorCitizen"]
+CATEGORICAL_FEATURES = ["Partner", "Dependents", "MultipleLines", "InternetService", "StreamingTV",
+                        "StreamingMovies", "Contract"]
+# Columns a file to score must have; AvgCharges is derived when it is missing
+INPUT_COLUMNS = [c for c in NUMERIC_FEATURES if c != "AvgCharges"] + CATEGORICAL_FEATURES
+SCORE_COLUMNS = ["Churn_Probability", "Predicted_Churn"]
+L2 = 1.0
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-8
+THRESHOLD = 0.5
+
+
+def prepare_features(df):
+    """Add AvgCharges (TotalCharges / tenure, MonthlyCharges for new customers) when it is missing."""
+    if "AvgCharges" in df.columns:
+        return df
+    tenure = pd.to_numeric(df["tenure"], errors="coerce")
+    total = pd.to_numeric(df["TotalCharges"], errors="coerce")
+    average = (total / tenure.where(tenure > 0)).fillna(pd.to_numeric(df["MonthlyCharges"], errors="coerce"))
+    return df.assign(AvgCharges=average)
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+
+class ChurnModel:
+    """Fitted coefficients plus the standardization and one-hot maps needed to score raw rows."""
+
+    def __init__(self, intercept, numeric, categorical, threshold=THRESHOLD, metrics=None):
+        self.intercept = float(intercept)
+        self.numeric = numeric            # column -> {"mean", "std", "coef"}
+        self.categorical = categorical    # column -> {level: coef}
+        self.threshold = threshold
+        self.metrics = metrics or {}
+        self._levels = {c: pd.Index(list(levels)) for c, levels in categorical.items()}
+        # A trailing 0 is what code -1 (unknown level or missing value) picks up
+        self._weights = {c: np.append(np.array(list(levels.values()), dtype=float), 0.0)
+                         for c, levels in categorical.items()}
+
+    # ------------------- Fitting -------------------
+    @classmethod
+    def fit(cls, df, target="Churn_binary", l2=L2):
+        """Fit on a frame with the input features and a 0/1 `target` column."""
+        df = prepare_features(df)
+        numeric_values = df[NUMERIC_FEATURES].apply(pd.to_numeric, errors="coerce")
+        means, stds = numeric_values.mean(), numeric_values.std(ddof=0).replace(0, 1.0)
+        blocks = [((numeric_values - means) / stds).fillna(0.0).to_numpy()]
+        levels = {}
+        for column in CATEGORICAL_FEATURES:
+            categories = pd.Categorical(df[column].astype(str).where(df[column].notna()))
+            levels[column] = list(categories.categories)
+            blocks.append(np.eye(len(levels[column]))[categories.codes] * (categories.codes >= 0)[:, None])
+        x = np.hstack([np.ones((len(df), 1))] + blocks)
+        y = df[target].to_numpy(dtype=float)
+
+        # Newton / IRLS with an L2 penalty on everything but the intercept
+        penalty = np.full(x.shape[1], l2)
+        penalty[0] = 0.0
+        w = np.zeros(x.shape[1])
+        for _ in range(MAX_ITERATIONS):
+            p = _sigmoid(x @ w)
+            gradient = x.T @ (p - y) + penalty * w
+            hessian = (x * (p * (1 - p))[:, None]).T @ x + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            w -= step
+            if np.max(np.abs(step)) < TOLERANCE:
+                break
+
+        numeric = {c: {"mean": float(means[c]), "std": float(stds[c]), "coef": float(coef)}
+                   for c, coef in zip(NUMERIC_FEATURES, w[1:1 + len(NUMERIC_FEATURES)])}
+        categorical, offset = {}, 1 + len(NUMERIC_FEATURES)
+        for column in CATEGORICAL_FEATURES:
+            coefs = w[offset:offset + len(levels[column])]
+            categorical[column] = {level: float(coef) for level, coef in zip(levels[column], coefs)}
+            offset += len(levels[column])
+        model = cls(w[0], numeric, categorical)
+        model.metrics = {"training_rows": len(df),
+                         "training_accuracy": float(np.mean(model.predict(df) == y))}
+        return model
+
+    # ------------------- Scoring -------------------
+    def decision_function(self, df):
+        """Log-odds of churn for every row."""
+        df = prepare_features(df)
+        logits = np.full(len(df), self.intercept)
+        for column, params in self.numeric.items():
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+            standardized = (values - params["mean"]) / params["std"]
+            logits += params["coef"] * np.nan_to_num(standardized, nan=0.0)
+        for column, levels in self._levels.items():
+            # Look up each distinct value once; missing values keep code -1
+            codes, uniques = pd.factorize(df[column])
+            level_codes = np.append(levels.get_indexer(uniques.astype(str)), -1)
+            logits += self._weights[column][level_codes[codes]]
+        return logits
+
+    def predict_proba(self, df):
+        return _sigmoid(self.decision_function(df))
+
+    def predict(self, df):
+        return (self.predict_proba(df) >= self.threshold).astype(np.int8)
+
+    def score(self, df):
+        """`df` with AvgCharges (when derived), Churn_Probability and Predicted_Churn (0/1) columns added."""
+        df = prepare_features(df)
+        probability = self.predict_proba(df)
+        return df.assign(Churn_Probability=probability,
+                         Predicted_Churn=(probability >= self.threshold).astype(np.int8))
+
+    # ------------------- Artifact -------------------
+    def to_dict(self):
+        return {"intercept": self.intercept, "numeric": self.numeric, "categorical": self.categorical,
+                "threshold": self.threshold, "metrics": self.metrics}
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def load_or_fit(df, snapshot, model_dir=MODEL_DIR):
+    """The model fitted on `df`, read from the artifact of its dataset snapshot when one exists."""
+    path = os.path.join(model_dir, f"churn-{snapshot}.json")
+    try:
+        return ChurnModel.load(path)
+    except (OSError, ValueError):
+        pass
+    model = ChurnModel.fit(df)
+    os.makedirs(model_dir, exist_ok=True)
+    model.save(path)
+    return model
+
+
+def output_schema(input_columns):
+    """Fixed schema of scored output: model numerics as float64, every other input column as string."""
+    # Score columns already in the input (e.g. an earlier run's output) are replaced
+    columns = [c for c in input_columns if c not in SCORE_COLUMNS]
+    columns += [c for c in NUMERIC_FEATURES if c not in columns]
+    fields = [(c, pa.float64() if c in NUMERIC_FEATURES else pa.string()) for c in columns]
+    return pa.schema(fields + [("Churn_Probability", pa.float64()), ("Predicted_Churn", pa.int8())])
+
+
+def _coerce(scored, schema):
+    # Every chunk gets the same types, whatever pandas inferred for it (e.g. " " in TotalCharges)
+    out = {}
+    for field in schema:
+        values = scored[field.name]
+        if field.type == pa.string():
+            out[field.name] = values.astype(str).where(values.notna(), None)
+        elif field.type == pa.float64():
+            out[field.name] = pd.to_numeric(values, errors="coerce").astype("float64")
+        else:
+            out[field.name] = values
+    return pd.DataFrame(out)
+
+
+def score_file(model, input_path, output_path, chunk_rows=CHUNK_ROWS, log=print):
+    """Score a customer CSV chunk by chunk into a .parquet or .csv file; returns the row count."""
+    csv_output = output_path.endswith(".csv")
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    schema = output_schema(pd.read_csv(input_path, nrows=0).columns)
+    writer = None if csv_output else pq.ParquetWriter(tmp_path, schema)
+    n_rows, start = 0, time.perf_counter()
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunk_rows):
+            scored = _coerce(model.score(chunk), schema)
+            if csv_output:
+                scored.to_csv(tmp_path, mode="a" if n_rows else "w", header=not n_rows, index=False)
+            else:
+                writer.write_table(pa.Table.from_pandas(scored, schema=schema, preserve_index=False))
+            n_rows += len(scored)
+        if writer is not None:
+            writer.close()
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    seconds = time.perf_counter() - start
+    log(f"Scored {n_rows:,} customers in {seconds:.1f}s.")
+    return n_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit or apply the NumPy logistic churn model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit_parser = commands.add_parser("fit", help="fit on the telco churn dataset (or --input) and save the artifact")
+    fit_parser.add_argument("--input", default=None, help="training CSV with Churn_binary (default: telco_churn)")
+    fit_parser.add_argument("--output", required=True, help="model artifact .json")
+    score_parser = commands.add_parser("score", help="score a customer CSV")
+    score_parser.add_argument("input")
+    score_parser.add_argument("--model", required=True, help="model artifact .json")
+    score_parser.add_argument("--output", required=True, help="write the scored rows to this .parquet or .csv")
+    score_parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        training = pd.read_csv(args.input) if args.input else load_dataset("telco_churn")
+        model = ChurnModel.fit(training)
+        model.save(args.output)
+        print(f"Training accuracy {model.metrics['training_accuracy']:.1%} on {model.metrics['training_rows']:,} rows.")
+    else:
+        score_file(ChurnModel.load(args.model), args.input, args.output, chunk_rows=args.chunk_rows)
@@ -0,0 +1,142 @@
+"""Local-first dataset registry.
+
+Every dataset used by the pages is resolved to its bundled CSV under ``files/``.
+The first load converts the CSV into a typed Parquet snapshot named after the
+hash of the CSV contents; later loads memory-map that snapshot instead of
+re-parsing the CSV. Datasets that are not bundled are downloaded once into the
+cache directory and then treated like local files.
+"""
+import glob
+import hashlib
+import json
+import os
+import threading
+import urllib.request
+
+import pandas as pd
+
+from utils import CACHE_DIR, FILES_DIR
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "datasets")
+DOWNLOAD_DIR = os.path.join(CACHE_DIR, "downloads")
+
+# Bump when the snapshot conversion changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+# ------------------- Registry -------------------
+# file:       CSV name under files/ (or the download cache)
+# url:        remote copy, only used when the file is not bundled
+# dates:      columns to parse, mapped to their strftime format (None = infer)
+# categories: low-cardinality columns stored as pandas categoricals
+DATASETS = {
+    "car_sales": {
+        "file": "car_sales.csv",
+        "url": "https://raw.githubusercontent.com/puravpatel3/portfolio/7e1c707c1363b45cc59b4ed89a411f88fae04e82/files/car_sales.csv",
+        "dates": {"Date": "%m/%d/%Y"},
+        "categories": ["Dealer_Region", "Dealer_Name", "Model", "Body Style"],
+    },
+    "retail_sales": {
+        "file": "retail_sales_data_final.csv",
+        "url": "https://raw.githubusercontent.com/puravpatel3/portfolio/55f52c9a729c11496dbcc4a0ff3db811ca2aedb6/files/retail_sales_data_final.csv",
+        "dates": {"Order Date": "%Y-%m-%d", "Ship Date": "%Y-%m-%d"},
+        "categories": [],
+    },
+    "telco_churn": {
+        "file": "telco_customer_churn_with_predictions_final.csv",
+        "url": "https://raw.githubusercontent.com/puravpatel3/portfolio/3d0ea6e6edb91da1cc432498f5bb064717a165b9/files/telco_customer_churn_with_predictions_final.csv",
+        "dates": {},
+        "categories": [],
+    },
+    "ev_charging": {
+        "file": "ev_charging_patterns.csv",
+        "url": "https://raw.githubusercontent.com/puravpatel3/portfolio/main/files/ev_charging_patterns.csv",
+        "dates": {},
+        "categories": [],
+    },
+    "amazon_sentiment": {
+        "file": "final_amazon_sentiment_dataset.csv",
+        "url": "https://github.com/puravpatel3/portfolio/raw/9120460482515ef843eee964f7278e5b81b889ee/files/final_amazon_sentiment_dataset.csv",
+        "dates": {"review_date": None},
+        "categories": [],
+    },
+}
+
+# (path, mtime_ns, size) -> digest, so unchanged files are only hashed once per process
+_digest_memo = {}
+
+
+def _spec(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise KeyError(f"Unknown dataset '{name}'. Known datasets: {', '.join(sorted(DATASETS))}") from None
+
+
+def dataset_path(name):
+    """Return the local CSV path for a dataset, downloading it once if it is not bundled."""
+    spec = _spec(name)
+    bundled = os.path.join(FILES_DIR, spec["file"])
+    if os.path.exists(bundled):
+        return bundled
+
+    downloaded = os.path.join(DOWNLOAD_DIR, spec["file"])
+    if not os.path.exists(downloaded):
+        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+        tmp_path = downloaded + ".part"
+        urllib.request.urlretrieve(spec["url"], tmp_path)
+        os.replace(tmp_path, downloaded)
+    return downloaded
+
+
+def snapshot_hash(name):
+    """Content hash identifying the current snapshot of a dataset."""
+    path = dataset_path(name)
+    stat = os.stat(path)
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _digest_memo:
+        digest = hashlib.sha256()
+        # The conversion settings are part of the hash so edits to the registry invalidate snapshots
+        digest.update(json.dumps([SNAPSHOT_VERSION, _spec(name)], sort_keys=True).encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _digest_memo[memo_key] = digest.hexdigest()[:16]
+    return _digest_memo[memo_key]
+
+
+def _convert(name, csv_path):
+    spec = _spec(name)
+    df = pd.read_csv(csv_path)
+    for column, fmt in spec["dates"].items():
+        df[column] = pd.to_datetime(df[column], format=fmt)
+    for column in spec["categories"]:
+        df[column] = df[column].astype("category")
+    return df
+
+
+def snapshot_path(name):
+    """Return the Parquet snapshot for a dataset, building it if the CSV changed."""
+    digest = snapshot_hash(name)
+    path = os.path.join(SNAPSHOT_DIR, f"{name}-{digest}.parquet")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    df = _convert(name, dataset_path(name))
+    # Write to a temporary file first so concurrent sessions never read a partial snapshot
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    for stale in glob.glob(os.path.join(SNAPSHOT_DIR, f"{name}-*.parquet")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return path
+
+
+def load_dataset(name, columns=None):
+    """Load a registered dataset from its memory-mapped Parquet snapshot."""
+    return pd.read_parquet(snapshot_path(name), columns=columns, memory_map=True)
@@ -0,0 +1,46 @@
+"""Cascading filter options with per-option counts.
+
+Facets answers "which values of this column are still available given the other
+selections, and how many rows does each one match?" from the dictionary codes of
+a FilterIndex, so populating a dropdown is a bincount over the selected rows
+instead of a unique() scan of the full column.
+"""
+import numpy as np
+
+
+class Facets:
+    """Option lists and counts for the columns of a FilterIndex.
+
+    `weights` optionally gives each row a count (e.g. units per cube cell); by
+    default every row counts once.
+    """
+
+    def __init__(self, index, weights=None):
+        self.index = index
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        # Unfiltered value domains with counts, computed once per index
+        self._domains = {column: self._counts(column, None) for column in index.columns}
+
+    def _counts(self, column, mask):
+        codes = self.index.codes(column)
+        weights = self.weights
+        if mask is not None:
+            codes = codes[mask]
+            weights = None if weights is None else weights[mask]
+        present = codes >= 0
+        return np.bincount(codes[present], weights=None if weights is None else weights[present],
+                           minlength=len(self.index.values(column)))
+
+    def options(self, column, selections=None):
+        """[(value, count)] for the values of `column` that match the other selections.
+
+        The column's own selection is ignored, so the current choice stays listed
+        alongside its alternatives. Values with no matching rows are dropped.
+        """
+        others = {c: v for c, v in (selections or {}).items() if c != column}
+        if any(v is not None and v != "All" for v in others.values()):
+            counts = self._counts(column, self.index.mask(others))
+        else:
+            counts = self._domains[column]
+        values = self.index.values(column)
+        return [(values[i], int(counts[i])) for i in np.flatnonzero(counts)]
@@ -0,0 +1,78 @@
+"""Fast least-squares forecaster for interactive previews.
+
+Fits the same structure the Prophet models use (a trend, Fourier terms for each
+seasonality and optional extra regressors) as one ridge-regularized linear
+least-squares problem in NumPy, which takes milliseconds instead of a Stan fit.
+The trend is linear rather than piecewise (the pages' changepoint prior is tiny
+anyway) and the interval is a flat band from the residual spread.
+"""
+import numpy as np
+import pandas as pd
+
+# Two-sided 80% normal quantile, matching Prophet's default interval_width
+INTERVAL_Z = 1.2816
+RIDGE = 1e-6
+
+
+class FourierForecaster:
+    """Linear trend + Fourier seasonalities + regressors, fitted with numpy.linalg.lstsq."""
+
+    def __init__(self, seasonalities, regressors=()):
+        self.seasonalities = list(seasonalities)  # (name, period in days, fourier_order)
+        self.regressors = list(regressors)
+        self.history = None
+
+    def _design(self, df):
+        days = (df["ds"] - self.start).dt.total_seconds().to_numpy() / 86400.0
+        columns = {"intercept": np.ones(len(df)), "trend": days / self.span}
+        for name, period, order in self.seasonalities:
+            angles = 2 * np.pi * np.outer(days / period, np.arange(1, order + 1))
+            for k in range(order):
+                columns[f"{name}_sin{k + 1}"] = np.sin(angles[:, k])
+                columns[f"{name}_cos{k + 1}"] = np.cos(angles[:, k])
+        for regressor in self.regressors:
+            columns[regressor] = (df[regressor].to_numpy(dtype=float) - self.regressor_means[regressor])
+        return pd.DataFrame(columns)
+
+    def fit(self, df):
+        self.history = df.copy()
+        self.start = df["ds"].min()
+        self.span = max((df["ds"].max() - self.start).total_seconds() / 86400.0, 1.0)
+        self.regressor_means = {r: float(df[r].mean()) for r in self.regressors}
+        design = self._design(df)
+        x, y = design.to_numpy(), df["y"].to_numpy(dtype=float)
+        # A tiny ridge keeps the solve stable when a seasonal period exceeds the history
+        scale = np.sqrt(RIDGE * len(y))
+        x_ridge = np.vstack([x, scale * np.eye(x.shape[1])])
+        y_ridge = np.concatenate([y, np.zeros(x.shape[1])])
+        self.coef, *_ = np.linalg.lstsq(x_ridge, y_ridge, rcond=None)
+        self.columns = list(design.columns)
+        self.sigma = float(np.std(y - x @ self.coef))
+        return self
+
+    def make_future_dataframe(self, periods):
+        last = self.history["ds"].max()
+        future = pd.date_range(last + pd.Timedelta(days=1), periods=periods, freq="D")
+        return pd.DataFrame({"ds": pd.concat([self.history["ds"], pd.Series(future)], ignore_index=True)})
+
+    def predict(self, future):
+        design = self._design(future)
+        coef = pd.Series(self.coef, index=self.columns)
+        forecast = pd.DataFrame({"ds": future["ds"].to_numpy()})
+        forecast["trend"] = design[["intercept", "trend"]].to_numpy() @ coef[["intercept", "trend"]].to_numpy()
+        for name, _, order in self.seasonalities:
+            names = [f"{name}_{f}{k + 1}" for k in range(order) for f in ("sin", "cos")]
+            forecast[name] = design[names].to_numpy() @ coef[names].to_numpy()
+        forecast["yhat"] = design.to_numpy() @ self.coef
+        forecast["yhat_lower"] = forecast["yhat"] - INTERVAL_Z * self.sigma
+        forecast["yhat_upper"] = forecast["yhat"] + INTERVAL_Z * self.sigma
+        return forecast
+
+
+def fit_fast(train, periods, params, regressors=()):
+    """Counterpart of forecasting.fit_prophet: returns the fitted model and forecast frame."""
+    model = FourierForecaster(params["seasonalities"], regressors).fit(train)
+    future = model.make_future_dataframe(periods=periods)
+    for regressor in regressors:
+        future[regressor] = train[regressor].mean()
+    return model, model.predict(future)
@@ -0,0 +1,115 @@
+"""Cache of built Plotly figures shared by all sessions.
+
+Figures are keyed by page, chart id, filter state and the dataset snapshot
+hash, so a rerun or another visitor with the same selections skips both the
+aggregation and the figure construction. Built figures are kept in memory up to
+a budget measured in serialized JSON bytes, least recently used first out.
+With a spill directory, every figure is also written as JSON to disk (itself
+size-capped) and evicted figures are reloaded from there.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from utils import CACHE_DIR
+from utils.forecast_cache import cache_key
+
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, "figures")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_SPILL_BYTES = 256 * 1024 * 1024
+
+
+def figure_key(page, chart, filters, snapshot):
+    """Cache key of one chart for a filter selection on a dataset snapshot."""
+    return cache_key(page=page, chart=chart, filters=filters, snapshot=snapshot)
+
+
+class FigureCache:
+    """Memory-budgeted LRU of figures with an optional size-capped JSON spill on disk."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, spill_directory=None, max_spill_bytes=DEFAULT_MAX_SPILL_BYTES):
+        self.max_bytes = max_bytes
+        self.spill_directory = spill_directory
+        self.max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()  # key -> (figure, JSON size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if spill_directory:
+            os.makedirs(spill_directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.spill_directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached figure for `key`, or None on a miss. Callers must not mutate it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        if not self.spill_directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        figure = pio.from_json(text)
+        self._remember(key, figure, len(text))
+        return figure
+
+    def put(self, key, figure):
+        text = figure.to_json()
+        self._remember(key, figure, len(text))
+        if self.spill_directory:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict_spill()
+
+    def get_or_build(self, key, build):
+        """Return the cached figure for `key`, calling `build()` and storing its result on a miss."""
+        figure = self.get(key)
+        if figure is None:
+            figure = build()
+            self.put(key, figure)
+        return figure
+
+    def _remember(self, key, figure, size):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (figure, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _evict_spill(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.spill_directory):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.spill_directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_spill_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.spill_directory, name))
+                except OSError:
+                    continue
+                total -= size
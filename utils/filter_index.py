@@ -0,0 +1,78 @@
+"""Bitmap index for the sidebar filters.
+
+Each filter column is dictionary-encoded once and every distinct value gets a
+packed bitmap of the rows holding it. Applying any number of equality filters is
+then a bitwise AND of a few bitmaps, producing a row selection without
+materializing an intermediate DataFrame per filter.
+"""
+import numpy as np
+import pandas as pd
+
+# Selections equal to None or "All" leave a column unfiltered, matching the sidebar widgets
+ALL = "All"
+
+
+class FilterIndex:
+    """Dictionary-encoded columns with per-value packed row bitmaps."""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.columns = list(columns)
+        self._codes = {}    # column -> int32 value position per row (-1 = missing)
+        self._lookup = {}   # column -> {value: position}
+        self._values = {}   # column -> sorted distinct values
+        self._bitmaps = {}  # column -> uint8 array of shape (n_values, ceil(n_rows / 8))
+        for column in self.columns:
+            codes, uniques = pd.factorize(df[column], sort=True)  # missing values get code -1
+            self._codes[column] = codes.astype(np.int32)
+            self._values[column] = list(uniques)
+            self._lookup[column] = {value: i for i, value in enumerate(uniques)}
+            self._bitmaps[column] = self._pack(codes, len(uniques))
+        self._full = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def _pack(self, codes, n_values):
+        # One value's bitmap at a time through a reused row buffer, so no n_values x n_rows matrix exists
+        bitmaps = np.empty((n_values, (self.n_rows + 7) // 8), dtype=np.uint8)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(n_values + 1))
+        selected = np.zeros(self.n_rows, dtype=bool)
+        for i in range(n_values):
+            positions = order[bounds[i]:bounds[i + 1]]
+            selected[positions] = True
+            bitmaps[i] = np.packbits(selected)
+            selected[positions] = False
+        return bitmaps
+
+    def values(self, column):
+        """Sorted distinct non-missing values of an indexed column."""
+        return self._values[column]
+
+    def codes(self, column):
+        """Per-row position of each value in values(column); -1 marks missing values."""
+        return self._codes[column]
+
+    def value_bitmap(self, column, value):
+        position = self._lookup[column].get(value)
+        if position is None:
+            return np.zeros_like(self._full)
+        return self._bitmaps[column][position]
+
+    def bitmap(self, selections):
+        """Packed bitmap of the rows matching every {column: value} selection."""
+        result = self._full
+        for column, value in selections.items():
+            if value is None or value == ALL:
+                continue
+            result = result & self.value_bitmap(column, value)
+        return result
+
+    def mask(self, selections):
+        """Boolean row mask for the selections, usable directly as df[mask]."""
+        return np.unpackbits(self.bitmap(selections), count=self.n_rows).view(bool)
+
+    def rows(self, selections):
+        """Positional indices of the matching rows, usable with df.iloc."""
+        return np.flatnonzero(self.mask(selections))
+
+    def count(self, selections):
+        return int(np.unpackbits(self.bitmap(selections), count=self.n_rows).sum())
@@ -0,0 +1,105 @@
+"""On-disk cache of fitted Prophet models and their forecast frames.
+
+Entries are keyed by a hash of the filter selection, a fingerprint of the
+training data and the model hyperparameters, so a repeated selection is served
+without re-running Stan. The cache is bounded by total size on disk and evicts
+the least recently used entries first.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+import pandas as pd
+from prophet.serialize import model_from_json, model_to_json
+
+from utils import CACHE_DIR
+
+FORECAST_CACHE_DIR = os.path.join(CACHE_DIR, "forecasts")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def frame_fingerprint(df):
+    """Stable content hash of a DataFrame (values and column names, not the index)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(**parts):
+    """Hash keyword parts (filters, data fingerprint, hyperparameters) into a cache key."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class ForecastCache:
+    """Size-capped LRU cache of (model, forecast) pairs stored as files on disk."""
+
+    def __init__(self, directory=FORECAST_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def contains(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Return the cached (model, forecast) for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        try:
+            # Refresh the access time used for LRU ordering
+            os.utime(path)
+        except OSError:
+            pass
+        return model_from_json(entry["model"]), entry["forecast"]
+
+    def put(self, key, model, forecast):
+        entry = {"model": model_to_json(model), "forecast": forecast}
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def get_or_fit(self, key, fit):
+        """Return the cached entry for `key`, calling `fit()` and storing its result on a miss."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        model, forecast = fit()
+        self.put(key, model, forecast)
+        return model, forecast
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".pkl"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                total -= size
@@ -0,0 +1,141 @@
+"""Bounded process pool for Prophet fits requested from the pages.
+
+Fits run outside the Streamlit script thread so a new filter selection is not
+stuck behind a previous fit. Each caller owns a slot (one per session and
+chart); submitting a new key to a slot cancels the slot's previous job if it has
+not started yet, and identical keys already in flight are shared instead of
+fitted twice. Every fit is bounded by a timeout inside the worker process,
+counted from when the worker starts it, so time spent queued behind other fits
+does not count against it. A slot is released once its job finishes or is
+cancelled, so the bookkeeping only holds jobs still in flight.
+"""
+import math
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from utils.forecast_cache import ForecastCache
+from utils.pools import process_pool
+
+DEFAULT_MAX_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+DEFAULT_TIMEOUT = 120
+
+
+class ForecastTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ForecastTimeout("forecast fit exceeded its time limit")
+
+
+def _fit_and_store(cache_dir, key, timeout, fit, args):
+    # Runs in a worker process. SIGALRM frees the worker even if nobody is waiting any more.
+    use_alarm = hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(math.ceil(timeout))
+    try:
+        model, forecast = fit(*args)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    ForecastCache(cache_dir).put(key, model, forecast)
+    return key
+
+
+class ForecastExecutor:
+    """Runs forecast fits in a bounded process pool and stores results in a ForecastCache."""
+
+    def __init__(self, cache=None, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+        self.cache = cache or ForecastCache()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._pool = self._new_pool()
+        # Re-entrant because cancelling a future runs its done callback synchronously
+        self._lock = threading.RLock()
+        self._slots = {}     # slot -> key most recently requested for it, while that job is in flight
+        self._claims = {}    # key -> slots waiting on it
+        self._inflight = {}  # key -> future
+
+    def _new_pool(self):
+        return process_pool(self.max_workers)
+
+    def submit(self, slot, key, fit, *args):
+        """Queue `fit(*args)` for `key`, superseding whatever `slot` requested before."""
+        with self._lock:
+            previous = self._slots.get(slot)
+            if previous is not None and previous != key:
+                self._release(slot, previous)
+                self._cancel_if_unclaimed(previous)
+            self._slots[slot] = key
+            self._claims.setdefault(key, set()).add(slot)
+
+            future = self._inflight.get(key)
+            if future is None or future.cancelled():
+                try:
+                    future = self._pool.submit(_fit_and_store, self.cache.directory, key, self.timeout, fit, args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed by the OS); start a fresh pool instead of failing forever
+                    self._pool = self._new_pool()
+                    future = self._pool.submit(_fit_and_store, self.cache.directory, key, self.timeout, fit, args)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget(key, f))
+            return future
+
+    def _release(self, slot, key):
+        slots = self._claims.get(key)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._claims[key]
+
+    def _cancel_if_unclaimed(self, key):
+        # Only cancel when no other slot is still waiting on the same key
+        if key in self._claims:
+            return
+        future = self._inflight.get(key)
+        if future is not None:
+            future.cancel()
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+                # Finished or cancelled: the slots waiting on it no longer need tracking
+                for slot in self._claims.pop(key, ()):
+                    if self._slots.get(slot) == key:
+                        del self._slots[slot]
+
+    def forecast(self, slot, key, fit, *args, on_wait=None, poll_interval=0.25):
+        """Return the cached (model, forecast) for `key`, fitting it in the pool on a miss.
+
+        `on_wait(elapsed_seconds)` is called while the fit is running, which lets the
+        page update a placeholder (and lets Streamlit interrupt the wait on a rerun).
+        Raises ForecastTimeout if the fit runs longer than the timeout once a worker
+        has started it; waiting in the queue does not count.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self.submit(slot, key, fit, *args)
+        start = time.monotonic()
+        while True:
+            try:
+                future.result(timeout=poll_interval)
+                break
+            except FutureTimeoutError:
+                if on_wait is not None:
+                    on_wait(time.monotonic() - start)
+
+        cached = self.cache.get(key)
+        if cached is None:
+            raise RuntimeError("forecast finished but its result was evicted from the cache")
+        return cached
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,65 @@
+"""Calendar rollups and display tables for Prophet forecasts.
+
+Turns a daily forecast frame (ds, yhat, ...) into monthly or quarterly totals
+with running totals, for any horizon and optionally per segment, using
+resample-style grouping on `ds`. Currency formatting for the tables is done on
+whole columns at once.
+"""
+import pandas as pd
+
+FREQUENCIES = {
+    # name: (resample rule, period frequency, period column, label column, label format)
+    "month": ("MS", "M", "YearMonth", "Month", "%b"),
+    "quarter": ("QS", "Q", "YearQuarter", "Quarter", None),
+}
+
+
+def period_rollup(forecast, freq="month", start=None, end=None, value="yhat", by=None, complete=False):
+    """Sum `value` per calendar month or quarter between start and end (inclusive).
+
+    Returns one row per (segment,) period with columns ds (period start),
+    forecast and cumulative (a running total within each segment). With
+    `complete=True`, periods only partly inside the selected days (e.g. the
+    rest of the quarter after the last actual) are dropped.
+    """
+    rule, period_freq = FREQUENCIES[freq][:2]
+    mask = pd.Series(True, index=forecast.index)
+    if start is not None:
+        mask &= forecast["ds"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= forecast["ds"] <= pd.Timestamp(end)
+    keys = ([by] if by is not None else []) + [pd.Grouper(key="ds", freq=rule)]
+    rolled = (forecast.loc[mask, ([by] if by is not None else []) + ["ds", value]]
+              .groupby(keys, observed=True)[value].sum()
+              .reset_index()
+              .rename(columns={value: "forecast"}))
+    if complete and len(rolled):
+        days = forecast.loc[mask, "ds"]
+        period_end = rolled["ds"].dt.to_period(period_freq).dt.end_time.dt.normalize()
+        rolled = rolled[(rolled["ds"] >= days.min()) & (period_end <= days.max())].reset_index(drop=True)
+    running = rolled.groupby(by, observed=True)["forecast"] if by is not None else rolled["forecast"]
+    rolled["cumulative"] = running.cumsum()
+    return rolled
+
+
+def format_currency(values):
+    """Whole-dollar strings such as $1,234,567 for a numeric Series (truncated like int())."""
+    digits = values.astype("int64").astype(str)
+    return "$" + digits.str.replace(r"\B(?=(\d{3})+(?!\d))", ",", regex=True)
+
+
+def forecast_table(rolled, freq="month"):
+    """Display table for a period_rollup result: period, label and formatted forecast/cumulative revenue."""
+    _, period_freq, period_column, label_column, label_format = FREQUENCIES[freq]
+    periods = rolled["ds"].dt.to_period(period_freq)
+    if label_format is not None:
+        labels = rolled["ds"].dt.strftime(label_format)
+    else:
+        labels = "Q" + rolled["ds"].dt.quarter.astype(str)
+    table = pd.DataFrame({period_column: periods, label_column: labels})
+    extra = [c for c in rolled.columns if c not in ("ds", "forecast", "cumulative")]
+    for column in extra:
+        table.insert(0, column, rolled[column])
+    table["Revenue Forecast ($)"] = format_currency(rolled["forecast"])
+    table["Cumulative Revenue ($)"] = format_currency(rolled["cumulative"])
+    return table
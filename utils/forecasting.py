@@ -0,0 +1,81 @@
+"""Forecasting backends shared by the forecasting pages.
+
+Two interchangeable backends take a ds/y training frame and return a fitted
+model plus a forecast frame with ds, yhat, yhat_lower and yhat_upper: "prophet"
+(accurate, seconds per fit) and "fast" (NumPy least squares, milliseconds, for
+interactive previews). plot_forecast draws either result the same way.
+"""
+import plotly.graph_objects as go
+from prophet import Prophet
+
+from utils.fast_forecast import fit_fast
+
+# Hyperparameters used by the car sales and retail revenue forecasts
+PROPHET_PARAMS = {
+    "changepoint_prior_scale": 0.0015,
+    "seasonality_prior_scale": 10,
+    # (name, period in days, fourier_order)
+    "seasonalities": [
+        ("monthly", 30.5, 3),
+        ("quarterly", 91.25, 5),
+        ("yearly", 365.25, 10),
+    ],
+}
+
+
+def build_prophet(params=PROPHET_PARAMS, regressors=()):
+    """Construct an unfitted Prophet model from a params dict."""
+    model = Prophet(changepoint_prior_scale=params["changepoint_prior_scale"],
+                    seasonality_prior_scale=params["seasonality_prior_scale"])
+    for name, period, fourier_order in params["seasonalities"]:
+        model.add_seasonality(name=name, period=period, fourier_order=fourier_order)
+    for regressor in regressors:
+        model.add_regressor(regressor)
+    return model
+
+
+def fit_prophet(train, periods, params=PROPHET_PARAMS, regressors=()):
+    """Fit Prophet on a ds/y frame and forecast `periods` days past the history.
+
+    Extra regressors are held at their historical mean over the forecast horizon.
+    Returns the fitted model and the forecast frame.
+    """
+    model = build_prophet(params, regressors)
+    model.fit(train)
+    future = model.make_future_dataframe(periods=periods)
+    for regressor in regressors:
+        future[regressor] = train[regressor].mean()
+    forecast = model.predict(future)
+    return model, forecast
+
+
+# Backend name -> fit function with the fit_prophet signature
+BACKENDS = {
+    "prophet": fit_prophet,
+    "fast": fit_fast,
+}
+# Labels for the page selectors
+BACKEND_LABELS = {"fast": "Fast preview", "prophet": "Accurate (Prophet)"}
+
+
+def fit_with_backend(train, periods, backend="prophet", params=PROPHET_PARAMS, regressors=()):
+    """Fit with the named backend and return (model, forecast)."""
+    return BACKENDS[backend](train, periods, params=params, regressors=regressors)
+
+
+def plot_forecast(history, forecast):
+    """Actuals, forecast line and 80% interval band, styled like prophet.plot.plot_plotly."""
+    band = "rgba(0, 114, 178, 0.2)"
+    fig = go.Figure([
+        go.Scatter(x=history["ds"], y=history["y"], name="Actual", mode="markers",
+                   marker=dict(color="black", size=4)),
+        go.Scatter(x=forecast["ds"], y=forecast["yhat_lower"], mode="lines", line=dict(width=0),
+                   hoverinfo="skip", showlegend=False),
+        go.Scatter(x=forecast["ds"], y=forecast["yhat_upper"], mode="lines", line=dict(width=0),
+                   fill="tonexty", fillcolor=band, hoverinfo="skip", showlegend=False),
+        go.Scatter(x=forecast["ds"], y=forecast["yhat"], name="Predicted", mode="lines",
+                   line=dict(color="#0072B2", width=2)),
+    ])
+    fig.update_layout(showlegend=False, xaxis=dict(rangeslider=dict(visible=True), type="date"),
+                      yaxis_title="y")
+    return fig
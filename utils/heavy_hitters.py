@@ -0,0 +1,128 @@
+"""Heavy-hitter sketches for value counts and top-K queries on the EDA page.
+
+Each column keeps exact value counts until it has seen more than `exact_limit`
+distinct values. After that it switches to a Space-Saving summary of the
+`capacity` most frequent values, merged chunk by chunk (parallel Space-Saving),
+plus a Count-Min sketch whose point estimates tighten the Space-Saving
+overestimates. Reported counts are upper bounds with a known maximum error.
+"""
+import numpy as np
+import pandas as pd
+
+EXACT_LIMIT = 10_000
+CAPACITY = 1_000
+CM_WIDTH = 2048
+CM_DEPTH = 4
+
+
+class CountMinSketch:
+    """Count-Min sketch over pandas-hashable values (double hashing on one 64-bit hash)."""
+
+    def __init__(self, width=CM_WIDTH, depth=CM_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _buckets(self, values):
+        hashes = pd.util.hash_array(np.asarray(values))
+        low = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        high = (hashes >> np.uint64(32)).astype(np.int64)
+        return [(low + i * high) % self.width for i in range(self.depth)]
+
+    def add(self, values, counts):
+        for row, buckets in enumerate(self._buckets(values)):
+            np.add.at(self.table[row], buckets, counts)
+
+    def estimate(self, values):
+        rows = [self.table[row, buckets] for row, buckets in enumerate(self._buckets(values))]
+        return np.min(rows, axis=0)
+
+
+class ColumnHeavyHitters:
+    """Exact counts for low-cardinality columns, Space-Saving + Count-Min otherwise."""
+
+    def __init__(self, capacity=CAPACITY, exact_limit=EXACT_LIMIT):
+        self.capacity = capacity
+        self.exact_limit = exact_limit
+        self.total = 0
+        self.counts = pd.Series(dtype=np.int64)  # value -> count (an upper bound once approximate)
+        self.errors = None                       # value -> maximum overcount, None while exact
+        self.sketch = None
+
+    @property
+    def exact(self):
+        return self.errors is None
+
+    def update(self, values):
+        chunk = values.value_counts(dropna=True)
+        if chunk.empty:
+            return
+        self.total += int(chunk.sum())
+        if self.exact:
+            self.counts = self.counts.add(chunk, fill_value=0).astype(np.int64)
+            if len(self.counts) > self.exact_limit:
+                self._to_sketch()
+            return
+
+        self.sketch.add(chunk.index.to_numpy(), chunk.to_numpy())
+        # Parallel Space-Saving merge: a value missing from a truncated side may have occurred
+        # there up to that side's largest dropped count, which is added as count and error
+        chunk_floor = 0
+        if len(chunk) > self.capacity:
+            chunk_floor = int(chunk.iloc[self.capacity])
+            chunk = chunk.iloc[:self.capacity]
+        summary_floor = int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+        index = self.counts.index.union(chunk.index, sort=False)
+        counts = (self.counts.reindex(index, fill_value=summary_floor)
+                  + chunk.reindex(index, fill_value=chunk_floor))
+        errors = (self.errors.reindex(index, fill_value=summary_floor)
+                  + pd.Series(chunk_floor, index=index).where(~index.isin(chunk.index), 0))
+        self._keep_top(counts, errors)
+
+    def _to_sketch(self):
+        self.sketch = CountMinSketch()
+        self.sketch.add(self.counts.index.to_numpy(), self.counts.to_numpy())
+        self._keep_top(self.counts, pd.Series(0, index=self.counts.index, dtype=np.int64))
+
+    def _keep_top(self, counts, errors):
+        top = counts.sort_values(ascending=False, kind="stable").iloc[:self.capacity]
+        self.counts = top.astype(np.int64)
+        self.errors = errors.reindex(top.index).astype(np.int64)
+
+    def top(self, k=None):
+        """DataFrame of the k most frequent values with columns value, count and max_error."""
+        counts, errors = self.counts, self.errors
+        if not self.exact:
+            # Both sketches only overestimate, so the smaller estimate is the tighter bound
+            estimate = np.minimum(counts.to_numpy(), self.sketch.estimate(counts.index.to_numpy()))
+            errors = errors - (counts - estimate)
+            counts = pd.Series(estimate, index=counts.index)
+        else:
+            errors = pd.Series(0, index=counts.index, dtype=np.int64)
+        order = counts.sort_values(ascending=False, kind="stable").index
+        if k is not None:
+            order = order[:k]
+        # reindex, not [], so a boolean column's values are looked up as labels rather than used as a mask
+        return pd.DataFrame({"value": order, "count": counts.reindex(order).to_numpy(),
+                             "max_error": errors.reindex(order).clip(lower=0).to_numpy()})
+
+
+class HeavyHitters:
+    """Chunk observer keeping a ColumnHeavyHitters per column."""
+
+    def __init__(self, capacity=CAPACITY, exact_limit=EXACT_LIMIT):
+        self.capacity = capacity
+        self.exact_limit = exact_limit
+        self.columns = {}
+
+    def update(self, chunk):
+        for column in chunk.columns:
+            if column not in self.columns:
+                self.columns[column] = ColumnHeavyHitters(self.capacity, self.exact_limit)
+            self.columns[column].update(chunk[column])
+
+    def top(self, column, k=None):
+        return self.columns[column].top(k)
+
+    def exact(self, column):
+        return self.columns[column].exact
@@ -0,0 +1,163 @@
+"""Resized WebP/AVIF derivatives of the photos in files/, served as static files.
+
+The originals are multi-megapixel JPEGs shown at a few hundred pixels, so each
+one is re-encoded at its displayed width (and twice that for high-DPI screens)
+into static/img/, which Streamlit serves at app/static/img/ when
+server.enableStaticServing is on. Derivative filenames carry a hash of their
+content, so each URL is stable for as long as the photo is unchanged and a
+changed photo gets a new one. manifest.json maps each original and width to
+its derivative files and is what the pages read.
+
+Rebuild after adding or changing a photo with:
+
+    python -m utils.images
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import threading
+
+from PIL import Image, ImageOps
+
+from utils import FILES_DIR, ROOT_DIR
+
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+IMAGE_DIR = os.path.join(STATIC_DIR, "img")
+MANIFEST_PATH = os.path.join(IMAGE_DIR, "manifest.json")
+STATIC_URL = "app/static/img"
+
+CAROUSEL_PHOTOS = [
+    "Wedding_Reception.jpg",
+    "SuShi_Plus_Rishi.jpg",
+    "SuShi_Wedding.jpg",
+    "San_Diego_Bikes.jpg",
+    "Rob_Rishi_Housewarming.jpg",
+]
+CAROUSEL_WIDTH = 300
+
+# original in files/ -> displayed widths in CSS pixels
+DERIVATIVES = {
+    "pp_banner_linkedin.jfif": [700, 1400],
+    **{name: [CAROUSEL_WIDTH, 2 * CAROUSEL_WIDTH] for name in CAROUSEL_PHOTOS},
+}
+# format -> Pillow save options, in order of preference for <picture> sources
+FORMATS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 6},
+}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def _write(data, path):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_derivatives(derivatives=DERIVATIVES, log=print):
+    """Encode every original at each width and format, write the manifest and drop stale files."""
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    manifest = {}
+    for name, widths in derivatives.items():
+        with Image.open(os.path.join(FILES_DIR, name)) as original:
+            # Re-encoding drops EXIF, so bake any camera rotation into the pixels first
+            original = ImageOps.exif_transpose(original).convert("RGB")
+            stem = os.path.splitext(name)[0]
+            entry = manifest[name] = {"widths": {}}
+            for width in widths:
+                # Never upscale: a width beyond the original reuses the original size
+                width = min(width, original.width)
+                height = round(original.height * width / original.width)
+                resized = original.resize((width, height), Image.LANCZOS)
+                files = entry["widths"][str(width)] = {}
+                for fmt in FORMATS:
+                    data = _encode(resized, fmt)
+                    filename = f"{stem}-{width}-{hashlib.sha256(data).hexdigest()[:12]}.{fmt}"
+                    _write(data, os.path.join(IMAGE_DIR, filename))
+                    files[fmt] = filename
+                    log(f"{filename}: {len(data) / 1024:.0f} KB")
+            entry["height_ratio"] = original.height / original.width
+
+    _write(json.dumps(manifest, indent=1, sort_keys=True).encode(), MANIFEST_PATH)
+    keep = {f for entry in manifest.values() for files in entry["widths"].values() for f in files.values()}
+    for filename in os.listdir(IMAGE_DIR):
+        if filename != os.path.basename(MANIFEST_PATH) and filename not in keep:
+            os.remove(os.path.join(IMAGE_DIR, filename))
+    return manifest
+
+
+def load_manifest():
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def _srcset(widths, fmt):
+    return ", ".join(f"{STATIC_URL}/{files[fmt]} {width}w" for width, files in widths.items())
+
+
+def picture_html(name, alt, sizes, manifest=None, css_class=None, style=None):
+    """<picture> markup for an original in files/, offering AVIF then WebP at every derivative width.
+
+    `sizes` is the HTML sizes attribute (e.g. "300px" or "100vw") the browser
+    uses to pick the smallest derivative that is sharp at the displayed size.
+    """
+    widths = (manifest or load_manifest())[name]["widths"]
+    fallback = widths[min(widths, key=int)]["webp"]
+    sources = "".join(f'<source type="{MIME_TYPES[fmt]}" srcset="{_srcset(widths, fmt)}" sizes="{sizes}">'
+                      for fmt in FORMATS)
+    attributes = f' class="{css_class}"' if css_class else ""
+    attributes += f' style="{style}"' if style else ""
+    return f'<picture>{sources}<img src="{STATIC_URL}/{fallback}" alt="{alt}"{attributes}></picture>'
+
+
+def carousel_html(names, width, interval_ms=3000, manifest=None):
+    """Standalone HTML for components.html that rotates the photos in the browser.
+
+    Every photo is in the DOM from the start, so the browser fetches each
+    derivative once and the rotation itself never reruns the Streamlit script.
+    Returns (html, height in pixels) with the height fitting the tallest photo.
+    """
+    manifest = manifest or load_manifest()
+    height = math.ceil(width * max(manifest[name]["height_ratio"] for name in names))
+    slides = "".join(f'<div class="slide{" active" if i == 0 else ""}">'
+                     f'{picture_html(name, alt="Photo", sizes=f"{width}px", manifest=manifest)}</div>'
+                     for i, name in enumerate(names))
+    html = f"""
+<style>
+body {{margin: 0;}}
+.carousel {{position: relative; width: {width}px; height: {height}px; margin: 0 auto;}}
+.slide {{position: absolute; inset: 0; display: flex; align-items: center; justify-content: center;
+         opacity: 0; transition: opacity 0.6s ease-in-out;}}
+.slide.active {{opacity: 1;}}
+.slide img {{max-width: {width}px; max-height: {height}px;}}
+@media (prefers-reduced-motion: reduce) {{.slide {{transition: none;}}}}
+</style>
+<div class="carousel">{slides}</div>
+<script>
+const slides = document.querySelectorAll(".slide");
+let index = 0;
+setInterval(() => {{
+    if (document.hidden) return;
+    slides[index].classList.remove("active");
+    index = (index + 1) % slides.length;
+    slides[index].classList.add("active");
+}}, {interval_ms});
+</script>
+"""
+    return html, height
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the resized WebP/AVIF photo derivatives in static/img/.")
+    parser.parse_args()
+    build_derivatives()
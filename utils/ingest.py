@@ -0,0 +1,309 @@
+"""Chunked ingest for large user uploads on the EDA page.
+
+Uploads are read in chunks rather than parsed into one DataFrame. Column types
+are inferred (and integers downcast) from a sample of the first chunk, every
+chunk is appended to an on-disk Parquet file, and only a uniformly sampled
+preview of the rows stays in memory. Objects passed as `observers` see every
+chunk once, which lets statistics be collected in the same pass.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import CACHE_DIR
+
+UPLOAD_DIR = os.path.join(CACHE_DIR, "uploads")
+CHUNK_ROWS = 100_000
+SAMPLE_ROWS = 10_000
+PREVIEW_ROWS = 1_000
+# Uploads above this size use the streaming ingest by default
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+# Ingested uploads beyond this total size are evicted, least recently used first
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024 * 1024
+
+_INT_TYPES = [("int8", pa.int8()), ("int16", pa.int16()), ("int32", pa.int32()), ("int64", pa.int64())]
+
+
+@dataclass
+class IngestResult:
+    path: str                 # Parquet file holding every row
+    file_hash: str
+    n_rows: int
+    dtypes: dict              # column -> pandas dtype name
+    preview: pd.DataFrame     # uniform random sample of at most PREVIEW_ROWS rows
+    observers: list = field(default_factory=list)
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+    def iter_chunks(self, columns=None, batch_rows=CHUNK_ROWS):
+        """Stream the ingested rows back as DataFrames."""
+        _touch(self.path)
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+
+    def read_columns(self, columns):
+        _touch(self.path)
+        return pd.read_parquet(self.path, columns=list(columns), memory_map=True)
+
+
+def observe_frame(df, observers, chunk_rows=CHUNK_ROWS):
+    """Feed an in-memory DataFrame to chunk observers, as the streaming ingest would."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        for observer in observers:
+            observer.update(chunk)
+    return observers
+
+
+def file_hash(fileobj):
+    """sha256 of a binary file-like object, read in blocks; rewinds it afterwards."""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(1 << 20), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def _touch(path):
+    # Marks an ingested upload as recently used for the eviction below
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _evict_uploads(keep):
+    """Remove the least recently used ingested uploads until they fit MAX_UPLOAD_BYTES."""
+    entries = []
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        if not name.endswith(".parquet") or path == keep:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= MAX_UPLOAD_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+# ------------------- Type inference -------------------
+class _ColumnTypeError(ValueError):
+    """A chunk value that does not fit the type chosen for its column."""
+
+    def __init__(self, column, error):
+        super().__init__(f"{column}: {error}")
+        self.column = column
+
+def _infer_types(sample):
+    """Map each column to "int8".."int64", "float64", "bool" or "string" from a sample chunk."""
+    types = {}
+    for column in sample.columns:
+        values = sample[column]
+        if pd.api.types.is_bool_dtype(values):
+            types[column] = "bool"
+        elif pd.api.types.is_integer_dtype(values):
+            types[column] = _smallest_int(values.min(), values.max())
+        elif pd.api.types.is_numeric_dtype(values):
+            types[column] = "float64"
+        else:
+            types[column] = "string"
+    return types
+
+
+def _smallest_int(low, high):
+    for name, _ in _INT_TYPES:
+        info = np.iinfo(name)
+        # Leave headroom so later chunks slightly outside the sample's range still fit
+        if info.min <= 2 * low and 2 * high <= info.max:
+            return name
+    return "int64"
+
+
+def _widened(kind):
+    """Next wider type for a column whose values did not fit `kind`."""
+    return "float64" if kind.startswith("int") else "string"
+
+
+def _as_strings(types):
+    return {c: "string" for c in types}
+
+
+def _arrow_schema(types):
+    arrow_types = dict(_INT_TYPES, float64=pa.float64(), bool=pa.bool_(), string=pa.string())
+    return pa.schema([(str(c), arrow_types[t]) for c, t in types.items()])
+
+
+def _cast_column(values, kind):
+    if kind.startswith("int"):
+        numeric = pd.to_numeric(values, errors="raise")
+        if numeric.isna().any():
+            raise ValueError("missing values in an integer column")
+        if (numeric % 1 != 0).any():
+            raise ValueError("non-integral values in an integer column")
+        info = np.iinfo(kind)
+        if len(numeric) and (numeric.min() < info.min or numeric.max() > info.max):
+            raise OverflowError(f"values do not fit {kind}")
+        return numeric.astype(kind)
+    if kind == "float64":
+        return pd.to_numeric(values, errors="raise").astype("float64")
+    if kind == "bool":
+        if values.isna().any() or not pd.api.types.is_bool_dtype(values):
+            raise ValueError("non-boolean values")
+        return values
+    return values.astype("string").astype(object)
+
+
+def _cast_chunk(chunk, types):
+    out = {}
+    for column, kind in types.items():
+        try:
+            out[column] = _cast_column(chunk[column], kind)
+        except (ValueError, TypeError, OverflowError) as e:
+            raise _ColumnTypeError(column, e) from e
+    return pd.DataFrame(out)
+
+
+# ------------------- Ingest -------------------
+def _write(chunks_factory, types, path, observers, preview_rows, seed):
+    """Write every chunk to `path` with the given types; returns (n_rows, preview)."""
+    rng = np.random.default_rng(seed)
+    schema = _arrow_schema(types)
+    n_rows = 0
+    sample, sample_keys = None, None
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for chunk in chunks_factory():
+                chunk = _cast_chunk(chunk, types)
+                chunk.index = pd.RangeIndex(n_rows, n_rows + len(chunk))
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                for observer in observers:
+                    observer.update(chunk)
+
+                # Priority sampling: keep the rows with the smallest random keys seen so far
+                keys = rng.random(len(chunk))
+                if sample is None:
+                    sample, sample_keys = chunk, keys
+                else:
+                    sample = pd.concat([sample, chunk])
+                    sample_keys = np.concatenate([sample_keys, keys])
+                if len(sample) > preview_rows:
+                    keep = np.argpartition(sample_keys, preview_rows)[:preview_rows]
+                    sample, sample_keys = sample.iloc[keep], sample_keys[keep]
+                n_rows += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if sample is None:
+        preview = pd.DataFrame({c: pd.Series(dtype=object) for c in types})
+    else:
+        preview = sample.sort_index()
+    return n_rows, preview
+
+
+def _ingest(digest, name, chunks_factory, observers_factory, preview_rows):
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{name}.parquet")
+    sample = next(iter(chunks_factory(SAMPLE_ROWS)), None)
+    if sample is None:
+        raise ValueError("The uploaded file contains no rows.")
+    types = _infer_types(sample)
+
+    # A later chunk that does not fit the sampled type of a column widens just that column
+    # (int -> float64 -> string) and the file is rewritten; other errors fall back to all strings
+    while True:
+        observers = observers_factory()
+        try:
+            n_rows, preview = _write(lambda: chunks_factory(CHUNK_ROWS), types, path, observers,
+                                     preview_rows, seed=0)
+        except _ColumnTypeError as e:
+            if types[e.column] == "string":
+                raise ValueError(f"Could not ingest the file: {e}") from e
+            types = dict(types, **{e.column: _widened(types[e.column])})
+            continue
+        except (ValueError, TypeError, OverflowError) as e:
+            if types == _as_strings(types):
+                raise ValueError(f"Could not ingest the file: {e}") from e
+            types = _as_strings(types)
+            continue
+        _evict_uploads(keep=path)
+        dtypes = {str(c): str(preview[c].dtype) for c in preview.columns}
+        return IngestResult(path=path, file_hash=digest, n_rows=n_rows, dtypes=dtypes,
+                            preview=preview, observers=observers)
+
+
+def ingest_csv(fileobj, observers_factory=list, preview_rows=PREVIEW_ROWS):
+    """Stream a CSV upload into Parquet. `observers_factory()` returns fresh chunk observers."""
+    digest = file_hash(fileobj)
+
+    def chunks(rows):
+        fileobj.seek(0)
+        with pd.read_csv(fileobj, chunksize=rows) as reader:
+            yield from reader
+
+    return _ingest(digest, f"{digest}-csv", chunks, observers_factory, preview_rows)
+
+
+def excel_sheet_names(fileobj):
+    """Sheet names of an .xlsx upload without loading the cell data."""
+    from openpyxl import load_workbook
+
+    fileobj.seek(0)
+    workbook = load_workbook(fileobj, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+        fileobj.seek(0)
+
+
+def ingest_excel(fileobj, sheet_name, header=0, observers_factory=list, preview_rows=PREVIEW_ROWS):
+    """Stream one sheet of an .xlsx upload into Parquet; `header` is the 0-based header row."""
+    from openpyxl import load_workbook
+
+    digest = file_hash(fileobj)
+
+    def chunks(rows):
+        fileobj.seek(0)
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            sheet_rows = workbook[sheet_name].iter_rows(values_only=True)
+            for _ in range(header):
+                next(sheet_rows, None)
+            columns = [str(c) if c is not None else f"Unnamed: {i}"
+                       for i, c in enumerate(next(sheet_rows, ()))]
+            block = []
+            for row in sheet_rows:
+                block.append(row[:len(columns)])
+                if len(block) == rows:
+                    yield pd.DataFrame(block, columns=columns).infer_objects()
+                    block = []
+            if block:
+                yield pd.DataFrame(block, columns=columns).infer_objects()
+        finally:
+            workbook.close()
+
+    variant = hashlib.sha256(f"{sheet_name}:{header}".encode()).hexdigest()[:8]
+    return _ingest(digest, f"{digest}-xlsx-{variant}", chunks, observers_factory, preview_rows)
@@ -0,0 +1,16 @@
+"""Process pools that are safe to start from inside a Streamlit page."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def process_context():
+    # Streamlit installs the running page as __main__, so "spawn" and "forkserver" workers
+    # would re-execute the whole page on startup. "fork" reuses the imported modules instead;
+    # platforms without fork (Windows) fall back to spawn.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def process_pool(max_workers=None):
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context())
@@ -0,0 +1,48 @@
+"""Prefix search over a large set of IDs, ranked by a per-ID weight.
+
+The IDs are sorted once (case-insensitively), so every ID starting with a
+typed prefix is one contiguous slice found with two binary searches. Only the
+heaviest `limit` IDs of that slice are returned, which keeps a typeahead's
+option list bounded however large the catalog grows.
+"""
+import numpy as np
+
+PAGE_SIZE = 50
+# Sorts after every character an ID can contain, closing the prefix range
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Sorted IDs with weights (e.g. review counts) for ranked prefix lookups."""
+
+    def __init__(self, ids, weights):
+        ids = np.asarray(ids, dtype=str)
+        keys = np.char.lower(ids)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.ids = ids[order]
+        self.weights = np.asarray(weights)[order]
+
+    def _range(self, prefix):
+        prefix = prefix.strip().lower()
+        lo = np.searchsorted(self.keys, prefix, side="left")
+        hi = np.searchsorted(self.keys, prefix + _MAX_CHAR, side="left")
+        return lo, hi
+
+    def count(self, prefix=""):
+        """Number of IDs starting with `prefix`."""
+        lo, hi = self._range(prefix)
+        return int(hi - lo)
+
+    def search(self, prefix="", limit=PAGE_SIZE):
+        """IDs starting with `prefix` (case-insensitive), heaviest first, at most `limit` of them."""
+        lo, hi = self._range(prefix)
+        weights = self.weights[lo:hi]
+        if len(weights) > limit:
+            # Everything tied with the limit-th heaviest, so ties are broken by ID below, not arbitrarily
+            threshold = np.partition(weights, len(weights) - limit)[len(weights) - limit]
+            top = np.flatnonzero(weights >= threshold)
+        else:
+            top = np.arange(len(weights))
+        top = top[np.lexsort((self.keys[lo:hi][top], -weights[top]))][:limit]
+        return self.ids[lo:hi][top].tolist()
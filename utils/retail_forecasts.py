@@ -0,0 +1,128 @@
+"""Precomputed Prophet forecasts for the retail sales page.
+
+The retail forecast depends only on the daily training frame built from the
+selected filters, so forecasts are cached by a fingerprint of that frame. The
+warm-up job fits every region x Data Type x Category x outlier-toggle
+combination across a process pool and stores the results in the shared
+forecast cache; the page then only fits live when a selection is not covered.
+
+Run the warm-up directly with:
+
+    python -m utils.retail_forecasts --workers 4
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import as_completed
+
+from utils.datasets import load_dataset
+from utils.forecast_cache import ForecastCache, cache_key, frame_fingerprint
+from utils.forecast_executor import DEFAULT_MAX_WORKERS
+from utils.forecasting import PROPHET_PARAMS, fit_with_backend
+from utils.pools import process_pool
+
+FORECAST_PERIODS = 365
+REGRESSORS = ("discount",)
+OUTLIER_THRESHOLD = 10000
+MIN_TRAINING_DAYS = 30
+
+
+def training_frame(filtered_df, region="All", filter_outliers=False):
+    """Daily ds/y/discount frame for the historical rows of a region."""
+    region_df = filtered_df[filtered_df["Data Type"] == "Historical"]
+    if region != "All":
+        region_df = region_df[region_df["Region"] == region]
+
+    region_data = region_df.groupby("Order Date").agg(
+        total_sales=("Sales", "sum"),
+        avg_discount=("Discount", "mean")
+    ).reset_index()
+    region_data = region_data.rename(columns={"Order Date": "ds", "total_sales": "y", "avg_discount": "discount"})
+
+    if filter_outliers:
+        region_data = region_data[region_data["y"] <= OUTLIER_THRESHOLD]
+    return region_data
+
+
+def forecast_key(region_data):
+    """Cache key for a retail training frame; identical frames share one forecast."""
+    return cache_key(page="retail_sales", data=frame_fingerprint(region_data),
+                     params=PROPHET_PARAMS, regressors=REGRESSORS, periods=FORECAST_PERIODS)
+
+
+def fit_forecast(region_data, backend="prophet"):
+    return fit_with_backend(region_data, FORECAST_PERIODS, backend=backend, regressors=REGRESSORS)
+
+
+def iter_training_frames(df):
+    """Yield (selection, training frame) for every precomputed filter combination."""
+    for data_type in [None] + sorted(df["Data Type"].dropna().unique()):
+        for category in [None] + sorted(df["Category"].dropna().unique()):
+            filtered_df = df
+            if data_type is not None:
+                filtered_df = filtered_df[filtered_df["Data Type"] == data_type]
+            if category is not None:
+                filtered_df = filtered_df[filtered_df["Category"] == category]
+            for region in ["All"] + sorted(filtered_df["Region"].dropna().unique()):
+                for filter_outliers in (False, True):
+                    selection = {"data_type": data_type, "category": category,
+                                 "region": region, "filter_outliers": filter_outliers}
+                    yield selection, training_frame(filtered_df, region, filter_outliers)
+
+
+def _warm_one(key, region_data, cache_dir):
+    # Runs in a worker process; the result is written straight into the shared cache
+    model, forecast = fit_forecast(region_data)
+    ForecastCache(cache_dir).put(key, model, forecast)
+    return key
+
+
+def warm_up(workers=None, cache=None, log=print):
+    """Fit and cache every missing retail forecast. Returns the number of new fits."""
+    cache = cache or ForecastCache()
+    df = load_dataset("retail_sales")
+
+    jobs = {}
+    for selection, region_data in iter_training_frames(df):
+        if len(region_data) <= MIN_TRAINING_DAYS:
+            continue
+        key = forecast_key(region_data)
+        if key not in jobs and not cache.contains(key):
+            jobs[key] = (selection, region_data)
+
+    if not jobs:
+        log("All retail forecasts are already cached.")
+        return 0
+
+    log(f"Fitting {len(jobs)} retail forecasts...")
+    start = time.perf_counter()
+    with process_pool(workers) as pool:
+        futures = {pool.submit(_warm_one, key, region_data, cache.directory): selection
+                   for key, (selection, region_data) in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                log(f"Forecast failed for {futures[future]}: {e}")
+    log(f"Done in {time.perf_counter() - start:.1f}s.")
+    return len(jobs)
+
+
+def start_background_warm_up(workers=DEFAULT_MAX_WORKERS):
+    """Run the warm-up in a daemon thread so it never blocks page rendering.
+
+    The pool lives inside the Streamlit server, so it is capped like the page's
+    forecast executor to leave cores for the sessions being served.
+    """
+    thread = threading.Thread(target=warm_up, kwargs={"workers": workers, "log": logging.getLogger(__name__).info},
+                              name="retail-forecast-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute all retail sales forecasts.")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    warm_up(workers=args.workers)
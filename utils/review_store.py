@@ -0,0 +1,140 @@
+"""Reviews partitioned by calendar quarter for fast date-range queries.
+
+The reviews are sorted by date once and split into quarterly partitions whose
+boundaries are row offsets into the sorted order. Each partition carries
+precomputed (product, sentiment) counts, stored sparsely as the sorted keys
+that occur in it and their counts, so memory grows with the reviews rather
+than with quarters x catalog size. A date-range query is two binary searches
+for the range's rows plus the counts of the quarters it fully covers; only the
+(at most two) partially covered quarters at the edges are counted row by row.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class ReviewCounts:
+    quarters: pd.PeriodIndex
+    by_sentiment: np.ndarray      # (quarter, sentiment) review counts
+    product_codes: np.ndarray     # codes into ReviewStore.products with at least one review
+    product_counts: np.ndarray    # reviews of each of those products
+
+
+class ReviewStore:
+    """Date-sorted reviews with sparse per-quarter (product, sentiment) counts."""
+
+    def __init__(self, df, date="review_date", sentiment="overall_sentiment", product="ProductId"):
+        # Undated reviews never match a date range, so they are left out
+        dated = np.flatnonzero(df[date].notna().to_numpy())
+        order = dated[np.argsort(df[date].to_numpy()[dated], kind="stable")]
+        self.order = order  # sorted position -> position in df
+        self.dates = df[date].to_numpy()[order]
+        self.sentiment_codes, sentiments = pd.factorize(df[sentiment].to_numpy()[order], sort=True)
+        self.product_codes, products = pd.factorize(df[product].to_numpy()[order], sort=True)
+        self.sentiments, self.products = pd.Index(sentiments), pd.Index(products)
+        self.product_totals = np.bincount(self.product_codes[self.product_codes >= 0],
+                                          minlength=len(self.products))
+
+        first, last = pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[-1])
+        self.quarters = pd.period_range(first.to_period("Q"), last.to_period("Q"), freq="Q")
+        starts = self.quarters.start_time.to_numpy()
+        self.boundaries = np.append(np.searchsorted(self.dates, starts, side="left"), len(self.dates))
+        # Partition q's keys and counts are keys[key_offsets[q]:key_offsets[q + 1]]
+        partitions = [self._count_rows(self.boundaries[q], self.boundaries[q + 1])
+                      for q in range(len(self.quarters))]
+        self.keys = np.concatenate([keys for keys, _ in partitions])
+        self.key_counts = np.concatenate([counts for _, counts in partitions])
+        self.key_offsets = np.cumsum([0] + [len(keys) for keys, _ in partitions])
+
+    def _count_rows(self, lo, hi):
+        # Sorted product * n_sentiments + sentiment keys of the sorted rows lo:hi, with their counts
+        sentiments, products = self.sentiment_codes[lo:hi], self.product_codes[lo:hi]
+        valid = (sentiments >= 0) & (products >= 0)
+        keys = products[valid].astype(np.int64) * len(self.sentiments) + sentiments[valid]
+        return np.unique(keys, return_counts=True)
+
+    def _row_range(self, start, end):
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), side="right")
+        return lo, max(lo, hi)
+
+    def _select(self, keys, counts, product_code, sentiment_code):
+        n_sentiments = len(self.sentiments)
+        if product_code is not None:
+            # Keys are sorted, so one product's keys are a contiguous run
+            lo, hi = np.searchsorted(keys, [product_code * n_sentiments, (product_code + 1) * n_sentiments])
+            keys, counts = keys[lo:hi], counts[lo:hi]
+        if sentiment_code is not None:
+            keep = keys % n_sentiments == sentiment_code
+            keys, counts = keys[keep], counts[keep]
+        return keys, counts
+
+    def counts(self, start, end, product=None, sentiment=None):
+        """Review counts of the reviews dated start..end (inclusive), optionally for one product/sentiment."""
+        n_sentiments = len(self.sentiments)
+        product_code = self._code(self.products, product)
+        sentiment_code = self._code(self.sentiments, sentiment)
+        lo, hi = self._row_range(start, end)
+        empty = np.zeros(0, dtype=np.int64)
+        if lo == hi or product_code == -1 or sentiment_code == -1:
+            return ReviewCounts(self.quarters[:0], np.zeros((0, n_sentiments), dtype=np.int64), empty, empty)
+
+        first = np.searchsorted(self.boundaries, lo, side="right") - 1
+        last = np.searchsorted(self.boundaries, hi - 1, side="right") - 1
+        by_sentiment, all_keys, all_counts = [], [], []
+        for q in range(first, last + 1):
+            q_lo, q_hi = self.boundaries[q], self.boundaries[q + 1]
+            if lo <= q_lo and q_hi <= hi:
+                span = slice(self.key_offsets[q], self.key_offsets[q + 1])
+                keys, counts = self.keys[span], self.key_counts[span]
+            else:
+                keys, counts = self._count_rows(max(lo, q_lo), min(hi, q_hi))
+            keys, counts = self._select(keys, counts, product_code, sentiment_code)
+            by_sentiment.append(np.bincount(keys % n_sentiments, weights=counts, minlength=n_sentiments))
+            all_keys.append(keys // n_sentiments)
+            all_counts.append(counts)
+
+        # One catalog-sized vector per query (not per quarter), reduced to the products present
+        totals = np.bincount(np.concatenate(all_keys), weights=np.concatenate(all_counts),
+                             minlength=len(self.products))
+        product_codes = np.flatnonzero(totals)
+        return ReviewCounts(self.quarters[first:last + 1], np.array(by_sentiment, dtype=np.int64),
+                            product_codes, totals[product_codes].astype(np.int64))
+
+    def positions(self, start, end, product=None, sentiment=None):
+        """Positions in the original frame of the reviews matching a query, in date order."""
+        lo, hi = self._row_range(start, end)
+        keep = np.ones(hi - lo, dtype=bool)
+        if product is not None:
+            keep &= self.product_codes[lo:hi] == self._code(self.products, product)
+        if sentiment is not None:
+            keep &= self.sentiment_codes[lo:hi] == self._code(self.sentiments, sentiment)
+        return self.order[lo:hi][keep]
+
+    @staticmethod
+    def _code(categories, value):
+        # Code of a selected value (-1 if it never occurs), None when nothing is selected
+        if value is None:
+            return None
+        return int(categories.get_indexer([value])[0])
+
+    def sentiment_counts(self, counts):
+        """Reviews per sentiment, most frequent first, with the zero rows dropped."""
+        totals = pd.Series(counts.by_sentiment.sum(axis=0), index=self.sentiments)
+        return totals[totals > 0].sort_values(ascending=False, kind="stable")
+
+    def quarterly_trend(self, counts):
+        """Long quarter/sentiment/count frame of a counts() result, like a groupby(...).size()."""
+        trend = pd.DataFrame({
+            "quarter": np.repeat(counts.quarters.astype(str), len(self.sentiments)),
+            "sentiment": np.tile(self.sentiments, len(counts.quarters)),
+            "count": counts.by_sentiment.ravel(),
+        })
+        return trend[trend["count"] > 0].reset_index(drop=True)
+
+    def top_products(self, counts, n=10):
+        """The n most reviewed products of a counts() result, most reviewed first."""
+        totals = pd.Series(counts.product_counts, index=self.products[counts.product_codes])
+        return totals[totals > 0].sort_values(ascending=False, kind="stable").head(n)
@@ -0,0 +1,205 @@
+"""Offline scoring of raw review text into the sentiment page's dataset.
+
+Reviews are streamed from a CSV in chunks. Each review's text is scored with
+VADER (compound score and a Positive/Neutral/Negative label) and, optionally,
+its aspects are extracted as the lemmas of spaCy noun chunks, in batches across
+a process pool. Scores are cached on disk by a hash of the review text, so a
+re-run over a corpus with a new weekly batch appended only scores the new or
+edited reviews. Results are written chunk by chunk to Parquet (or CSV).
+
+Needs the vaderSentiment package, and spaCy with the en_core_web_sm model for
+aspects; neither is required by the app itself. Run it with, for example:
+
+    python -m utils.sentiment_scoring Reviews.csv --output final_amazon_sentiment_dataset.parquet --workers 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import CACHE_DIR
+from utils.forecast_cache import cache_key
+from utils.ingest import CHUNK_ROWS
+from utils.pools import process_pool
+
+SCORE_CACHE_DIR = os.path.join(CACHE_DIR, "sentiment_scores")
+# Bump when the scoring rules change so cached scores are not reused
+SCORER_VERSION = 1
+BATCH_ROWS = 2_000
+# VADER's recommended compound score thresholds
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+SPACY_MODEL = "en_core_web_sm"
+SCORE_COLUMNS = ["compound", "overall_sentiment", "refined_aspects"]
+OUTPUT_SCHEMA = pa.schema([
+    ("Id", pa.int64()),
+    ("ProductId", pa.string()),
+    ("Text", pa.string()),
+    ("review_date", pa.timestamp("ns")),
+    ("compound", pa.float64()),
+    ("overall_sentiment", pa.string()),
+    ("refined_aspects", pa.string()),
+])
+
+# Loaded once per worker process on first use
+_analyzer = None
+_nlp = None
+
+
+def _vader():
+    global _analyzer
+    if _analyzer is None:
+        try:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        except ImportError as e:
+            raise ImportError("Sentiment scoring needs VADER: pip install vaderSentiment") from e
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def _spacy():
+    global _nlp
+    if _nlp is None:
+        try:
+            import spacy
+        except ImportError as e:
+            raise ImportError(f"Aspect extraction needs spaCy: pip install spacy && "
+                              f"python -m spacy download {SPACY_MODEL}") from e
+        _nlp = spacy.load(SPACY_MODEL, disable=["ner"])
+    return _nlp
+
+
+def sentiment_label(compound):
+    """Positive/Neutral/Negative labels for an array of VADER compound scores."""
+    return np.select([compound >= POSITIVE_THRESHOLD, compound <= NEGATIVE_THRESHOLD],
+                     ["Positive", "Negative"], default="Neutral")
+
+
+def _aspects(doc):
+    # Noun chunk heads, lemmatized, without stop words, punctuation or very short tokens
+    lemmas = [chunk.root.lemma_.lower() for chunk in doc.noun_chunks
+              if chunk.root.is_alpha and not chunk.root.is_stop and len(chunk.root) > 2]
+    return ", ".join(lemmas) if lemmas else None
+
+
+def _score_batch(texts, aspects):
+    # Runs in a worker process
+    analyzer = _vader()
+    compound = np.array([analyzer.polarity_scores(text)["compound"] for text in texts])
+    scores = pd.DataFrame({"compound": compound, "overall_sentiment": sentiment_label(compound)})
+    if aspects:
+        scores["refined_aspects"] = [_aspects(doc) for doc in _spacy().pipe(texts, batch_size=256)]
+    else:
+        scores["refined_aspects"] = None
+    return scores
+
+
+def text_hashes(texts):
+    """64-bit hash of every review text, the key of the score cache."""
+    return pd.util.hash_pandas_object(texts.fillna("").astype(str), index=False).to_numpy()
+
+
+def _cache_path(cache_dir, aspects):
+    return os.path.join(cache_dir, f"{cache_key(scorer=SCORER_VERSION, aspects=aspects)}.parquet")
+
+
+def _load_cache(path):
+    try:
+        return pd.read_parquet(path).set_index("text_hash")
+    except (OSError, ValueError):
+        return pd.DataFrame(columns=SCORE_COLUMNS, index=pd.Index([], dtype="uint64", name="text_hash"))
+
+
+def _save_cache(cache, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    cache.reset_index().to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _output_frame(chunk, scores, text_column, date_column):
+    out = pd.DataFrame({
+        "Id": chunk["Id"].astype("int64"),
+        "ProductId": chunk["ProductId"].astype(str),
+        "Text": chunk[text_column],
+    })
+    dates = chunk[date_column]
+    # The raw Amazon reviews carry Unix timestamps in seconds
+    out["review_date"] = (pd.to_datetime(dates, unit="s") if pd.api.types.is_numeric_dtype(dates)
+                          else pd.to_datetime(dates))
+    for column in SCORE_COLUMNS:
+        out[column] = scores[column].to_numpy()
+    return out
+
+
+def score_reviews(input_path, output_path, text_column="Text", date_column="Time", aspects=True,
+                  workers=None, chunk_rows=CHUNK_ROWS, cache_dir=SCORE_CACHE_DIR, log=print):
+    """Score every review of a CSV and write the page's columns to `output_path`.
+
+    Returns a dict with the number of rows written and how many distinct texts
+    were scored versus taken from the cache.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = _cache_path(cache_dir, aspects)
+    cache = _load_cache(cache_path)
+    stats = {"rows": 0, "scored": 0, "cached": 0}
+    start = time.perf_counter()
+
+    csv_output = output_path.endswith(".csv")
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    writer = None if csv_output else pq.ParquetWriter(tmp_path, OUTPUT_SCHEMA)
+    try:
+        with process_pool(workers) as pool:
+            for chunk in pd.read_csv(input_path, chunksize=chunk_rows):
+                hashes = text_hashes(chunk[text_column])
+                first = ~pd.Index(hashes).duplicated()
+                new = first & ~pd.Index(hashes).isin(cache.index)
+                texts = chunk[text_column].fillna("").astype(str).to_numpy()[new].tolist()
+                stats["cached"] += int(first.sum() - new.sum())
+                if texts:
+                    batches = [texts[i:i + BATCH_ROWS] for i in range(0, len(texts), BATCH_ROWS)]
+                    scored = pd.concat(pool.map(_score_batch, batches, [aspects] * len(batches)),
+                                       ignore_index=True)
+                    scored.index = pd.Index(hashes[new], name="text_hash")
+                    cache = pd.concat([cache, scored]) if len(cache) else scored
+                    stats["scored"] += len(texts)
+
+                out = _output_frame(chunk, cache.reindex(hashes), text_column, date_column)
+                if csv_output:
+                    out.to_csv(tmp_path, mode="a" if stats["rows"] else "w", header=not stats["rows"], index=False)
+                else:
+                    writer.write_table(pa.Table.from_pandas(out, schema=OUTPUT_SCHEMA, preserve_index=False))
+                stats["rows"] += len(out)
+                log(f"{stats['rows']:,} reviews: {stats['scored']:,} scored, {stats['cached']:,} from cache")
+        if writer is not None:
+            writer.close()
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        # Scores computed before a failure are kept for the next run
+        _save_cache(cache, cache_path)
+    log(f"Done in {time.perf_counter() - start:.1f}s.")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score raw reviews into the sentiment analysis dataset.")
+    parser.add_argument("input", help="CSV with Id, ProductId, the review text and a date column")
+    parser.add_argument("--output", required=True, help="write the scored reviews to this .parquet or .csv")
+    parser.add_argument("--text-column", default="Text")
+    parser.add_argument("--date-column", default="Time", help="Unix seconds or parseable dates")
+    parser.add_argument("--no-aspects", action="store_true", help="skip the spaCy aspect extraction")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    score_reviews(args.input, args.output, text_column=args.text_column, date_column=args.date_column,
+                  aspects=not args.no_aspects, workers=args.workers, chunk_rows=args.chunk_rows)
@@ -0,0 +1,221 @@
+"""Single-pass summary statistics for the EDA page.
+
+SummaryStats consumes a table chunk by chunk and keeps constant-size state per
+column: count, mean and variance (merged with Chan's parallel update), min/max,
+a KLL sketch for quantiles and a HyperLogLog sketch for distinct counts. Small
+inputs stay exact: quantiles and distinct counts switch to sketches only once a
+column has seen more than `exact_limit` values.
+Datetime columns get the same moments on their nanosecond values, and the
+top/freq rows of other columns come from the page's heavy-hitter counts.
+"""
+import numpy as np
+import pandas as pd
+
+EXACT_LIMIT = 10_000
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang & Liberty) over float values."""
+
+    def __init__(self, k=400, exact_limit=EXACT_LIMIT, seed=0):
+        self.k = k
+        self.exact_limit = exact_limit
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        if self.count > self.exact_limit:
+            self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays behind; every other remaining item moves up with double weight
+                keep = items[:len(items) % 2]
+                paired = items[len(items) % 2:]
+                promoted = paired[self._rng.integers(2)::2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                level = 0  # capacities shrink when a level is added, so re-check from the bottom
+                continue
+            level += 1
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return [np.nan for _ in qs]
+        if len(self._levels) == 1:
+            # Nothing was compacted yet: exact, with the same interpolation as DataFrame.describe
+            return list(np.quantile(self._levels[0], qs))
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(v), 2 ** i, dtype=np.float64) for i, v in enumerate(self._levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        return list(items[np.minimum(np.searchsorted(cumulative, ranks), len(items) - 1)])
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length for uint64 arrays."""
+    values = values.copy()
+    lengths = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        large = values >= (np.uint64(1) << np.uint64(shift))
+        lengths[large] += shift
+        values[large] >>= np.uint64(shift)
+    return lengths + (values > 0)
+
+
+class HyperLogLog:
+    """Approximate distinct counter; exact (a set of hashes) up to `exact_limit` values."""
+
+    def __init__(self, precision=14, exact_limit=EXACT_LIMIT):
+        self.p = precision
+        self.m = 1 << precision
+        self.exact_limit = exact_limit
+        self._exact = set()
+        self._registers = None
+
+    def update(self, values):
+        hashes = pd.util.hash_array(np.asarray(values))
+        if self._registers is None:
+            self._exact.update(hashes.tolist())
+            if len(self._exact) <= self.exact_limit:
+                return
+            hashes = np.fromiter(self._exact, dtype=np.uint64, count=len(self._exact))
+            self._exact = set()
+            self._registers = np.zeros(self.m, dtype=np.uint8)
+        suffix_bits = 64 - self.p
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        rank = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self._registers, index, rank)
+
+    @property
+    def exact(self):
+        return self._registers is None
+
+    def estimate(self):
+        if self._registers is None:
+            return len(self._exact)
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(2.0 ** -self._registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self._registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * np.log(self.m / zeros)))  # linear counting for small ranges
+        return int(round(raw))
+
+
+class _ColumnStats:
+    def __init__(self, kind):
+        self.kind = kind  # "numeric", "datetime" or "other"
+        self.tz = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.quantiles = KLLSketch() if kind != "other" else None
+        self.distinct = HyperLogLog()
+
+    def update(self, values):
+        values = values[values.notna()]
+        if values.empty:
+            return
+        if self.kind == "other":
+            self.distinct.update(values.to_numpy())
+            self.count += len(values)
+            return
+        if self.kind == "datetime":
+            # Nanoseconds since the epoch (UTC for tz-aware columns), converted back in timestamp()
+            index = pd.DatetimeIndex(values)
+            self.tz = index.tz
+            x = index.as_unit("ns").asi8.astype(np.float64)
+        else:
+            x = values.to_numpy(dtype=np.float64)
+        n, mean = len(x), x.mean()
+        m2 = ((x - mean) ** 2).sum()
+        # Chan et al. parallel merge of (count, mean, M2)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+        self.quantiles.update(x)
+
+    def timestamp(self, value):
+        stamp = pd.Timestamp(int(round(value)), unit="ns")
+        return stamp.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else stamp
+
+
+def _kind(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return "numeric"
+    return "other"
+
+
+class SummaryStats:
+    """Chunk observer producing a DataFrame.describe(include='all')-style summary."""
+
+    def __init__(self):
+        self._columns = {}
+
+    def update(self, chunk):
+        for column in chunk.columns:
+            values = chunk[column]
+            if column not in self._columns:
+                self._columns[column] = _ColumnStats(_kind(values))
+            self._columns[column].update(values)
+
+    def result(self, heavy_hitters=None):
+        """The summary table; top/freq of non-numeric columns come from a HeavyHitters fed the same chunks.
+
+        Without `heavy_hitters` the top and freq rows are left empty, and they are
+        also left empty when the heavy-hitter count of the top value is only an
+        upper bound. Past the exact limit unique is a HyperLogLog estimate
+        (see approximate_unique), capped at the column's count.
+        """
+        rows = ["count", "unique", "top", "freq", "mean", "std", "min"] + [f"{q:.0%}" for q in QUANTILES] + ["max"]
+        table = {}
+        for column, stats in self._columns.items():
+            values = [stats.count] + [np.nan] * (len(rows) - 1)
+            if stats.kind == "other":
+                top = None
+                if heavy_hitters is not None and column in heavy_hitters.columns:
+                    top = heavy_hitters.top(column, 1)
+                values[1] = min(stats.distinct.estimate(), stats.count)
+                # A zero error bound means the count is exact, and no other value can outnumber it
+                if top is not None and len(top) and top["max_error"].iloc[0] == 0:
+                    values[2:4] = [top["value"].iloc[0], top["count"].iloc[0]]
+            elif stats.count:
+                std = np.sqrt(stats.m2 / (stats.count - 1)) if stats.count > 1 else np.nan
+                moments = [stats.mean, std, stats.min, *stats.quantiles.quantiles(QUANTILES), stats.max]
+                if stats.kind == "datetime":
+                    # Like describe(), datetimes get no standard deviation
+                    moments = [stats.timestamp(v) if i != 1 else np.nan for i, v in enumerate(moments)]
+                values[4:] = moments
+            table[column] = values
+        return pd.DataFrame(table, index=rows)
+
+    def approximate_unique(self):
+        """Columns whose unique count is a HyperLogLog estimate rather than exact."""
+        return [column for column, stats in self._columns.items()
+                if stats.kind == "other" and not stats.distinct.exact]
+